@@ -222,14 +222,18 @@ async function scanBotsInDirectory(directory) {
                         const fileStats = await fs.stat(filePath);
                         
                         if (fileStats.isFile()) {
-                            const content = await fs.readFile(filePath, 'utf8');
-                            const hash = crypto.createHash('sha256').update(content).digest('hex');
+                            // İkili dosyalar (resim, sqlite, .node) base64 olarak gönderilir
+                            const data = await fs.readFile(filePath);
+                            const encoding = isTextBuffer(data) ? 'utf-8' : 'base64';
+                            const content = data.toString(encoding === 'base64' ? 'base64' : 'utf8');
+                            const hash = crypto.createHash('sha256').update(data).digest('hex');
                             
                             botData.files.push({
                                 name: file,
                                 path: filePath,
                                 relativePath: file,
                                 content: content,
+                                encoding: encoding,
                                 hash: hash,
                                 size: fileStats.size,
                                 lastModified: fileStats.mtime
@@ -251,6 +255,19 @@ async function scanBotsInDirectory(directory) {
     }
 }
 
+// Dosya metin olarak (UTF-8) güvenle okunabilir mi
+function isTextBuffer(data) {
+    if (data.includes(0)) {
+        return false;
+    }
+    try {
+        new TextDecoder('utf-8', { fatal: true }).decode(data);
+        return true;
+    } catch (error) {
+        return false;
+    }
+}
+
 // Raspberry Pi'ye dosya senkronizasyonu
 async function syncFilesToRaspberry() {
     try {
@@ -236,7 +236,7 @@ function App() {
             
             // Yerel dosyaları da kaydet
             if (selectedBot && selectedBot.localPath) {
-                for (const file of files) {
+                for (const file of files.filter(f => f.encoding !== 'base64')) {
                     const filePath = `${selectedBot.localPath}/${file.name}`;
                     await window.electronAPI.writeFile(filePath, file.content);
                 }
@@ -112,7 +112,8 @@ const BotEditor = ({ bot, onSave, onBack }) => {
                 return {
                     name: fileName,
                     path: file?.relativePath || fileName,
-                    content: fileContents[fileName]
+                    content: fileContents[fileName],
+                    encoding: file?.encoding || 'utf-8'
                 };
             });
 
@@ -123,7 +124,8 @@ const BotEditor = ({ bot, onSave, onBack }) => {
 
             // Yerel dosyaları kaydet
             if (bot.localPath) {
-                for (const file of filesToSave) {
+                // İkili dosyalar metin editöründe değiştirilmez, yerel kopyaya dokunulmaz
+                for (const file of filesToSave.filter(f => f.encoding !== 'base64')) {
                     const filePath = `${bot.localPath}/${file.name}`;
                     await window.electronAPI.writeFile(filePath, file.content);
                 }
@@ -4,6 +4,7 @@
 import os
 import sys
 import json
+import argparse
 import time
 import signal
 import logging
@@ -15,32 +16,342 @@ import socketio
 from pathlib import Path
 from datetime import datetime
 from configparser import ConfigParser
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import hashlib
+import heapq
+import re
+import shutil
+import itertools
+import selectors
+import gzip
+import queue
+import atexit
+from collections import deque
+from datetime import timedelta
 
-# Loglama yapılandırması
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/var/log/bot_manager.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger('BotManager')
 
+DEFAULT_CONFIG_PATH = '/etc/bot_manager/config.ini'
+STATE_DIRECTORY = '/var/lib/bot_manager'
+LOG_DIRECTORY = '/var/log/bot_manager'
+
+
+def agent_paths(config_path, config):
+    """Durum ve log dosyalarının varsayılan yollarını getir
+    
+    Varsayılan yapılandırma dışındaki ajanlar (--config) yolları [system] name ile ayırır;
+    aynı makinedeki ajanlar birbirinin manifestini, görev önbelleğini ve logunu ezmez.
+    """
+    if os.path.abspath(config_path) == DEFAULT_CONFIG_PATH:
+        state_directory = STATE_DIRECTORY
+        log_name = 'bot_manager'
+    else:
+        agent_name = config.get('system', 'name', fallback=Path(config_path).stem)
+        log_name = re.sub(r'[^A-Za-z0-9_.-]', '_', agent_name)
+        state_directory = os.path.join(STATE_DIRECTORY, log_name)
+    
+    return {
+        'manifest_file': os.path.join(state_directory, 'bots_manifest.json'),
+        'cache_file': os.path.join(state_directory, 'scheduled_tasks.json'),
+        'preload_path': os.path.join(state_directory, 'liveness_preload.js'),
+        'log_file': os.path.join(LOG_DIRECTORY, f'{log_name}.log')
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """Log kayıtlarını tek satırlık JSON olarak biçimlendir"""
+    
+    # extra={...} ile verilebilen yapısal alanlar
+    FIELDS = ('bot', 'event', 'repeated')
+    
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for field in self.FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class QueueLogHandler(logging.Handler):
+    """Kayıtları çağıran thread'i bekletmeden kuyruğa atan handler"""
+    
+    def __init__(self, log_queue):
+        super().__init__()
+        self.log_queue = log_queue
+        self.dropped = 0
+    
+    def emit(self, record):
+        try:
+            # Mesaj burada hesaplanır, argümanlar yazıcı thread'e taşınmaz
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self.log_queue.put_nowait(record)
+        except queue.Full:
+            # Kuyruk doluysa bekleme, kaydı düşür ve say
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+
+class LogWriter:
+    """Kuyruktaki kayıtları tek thread ile toplu yazan, döndüren ve sıkıştıran sınıf"""
+    
+    def __init__(self, log_queue, handler, log_file, max_bytes=5 * 1024 * 1024, backup_count=5,
+                 rate_limit_window=60, rate_limit_burst=5, stdout=True, batch_size=256, flush_interval=1.0):
+        self.log_queue = log_queue
+        self.handler = handler
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rate_limit_window = rate_limit_window
+        self.rate_limit_burst = rate_limit_burst
+        self.stdout = stdout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.json_formatter = JsonFormatter()
+        self.text_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        # (logger, seviye, mesaj) -> [pencere başlangıcı, sayı, örnek kayıt]
+        self.recent = {}
+        self._summary_pending = []
+        self.last_summary = time.monotonic()
+        self.reported_drops = 0
+        self.stream = None
+        self.rotate_at = max_bytes
+        self.thread = None
+    
+    def start(self):
+        """Yazıcı thread'ini başlat"""
+        self._open()
+        self.thread = threading.Thread(target=self._loop, name='log-writer', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Kuyruğu boşalt ve dosyayı kapat"""
+        if self.thread and self.thread.is_alive():
+            self.log_queue.put(None)
+            self.thread.join(timeout=5)
+    
+    def _open(self):
+        Path(self.log_file).parent.mkdir(parents=True, exist_ok=True)
+        self.stream = open(self.log_file, 'a', encoding='utf-8')
+    
+    def _loop(self):
+        running = True
+        while running:
+            batch = []
+            try:
+                batch.append(self.log_queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self.log_queue.get_nowait())
+            except queue.Empty:
+                pass
+            
+            if None in batch:
+                running = False
+                batch = [record for record in batch if record is not None]
+            
+            try:
+                records = [record for record in batch if self._allow(record)]
+                records.extend(self._summaries(force=not running))
+                self._write(records)
+            except Exception as e:
+                sys.stderr.write(f"Log yazma hatası: {e}\n")
+        
+        if self.stream:
+            self.stream.close()
+    
+    def _allow(self, record):
+        """Aynı mesaj pencere içinde izin verilenden fazla tekrar ederse bastır"""
+        if not self.rate_limit_window:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        state = self.recent.get(key)
+        if state is None or record.created - state[0] >= self.rate_limit_window:
+            if state is not None and state[1] > self.rate_limit_burst:
+                self._summary_pending.append(self._summary_record(state))
+            self.recent[key] = [record.created, 1, record]
+            return True
+        state[1] += 1
+        return state[1] <= self.rate_limit_burst
+    
+    def _summary_record(self, state):
+        _, count, sample = state
+        summary = logging.makeLogRecord(sample.__dict__)
+        summary.msg = f"Önceki mesaj {count - self.rate_limit_burst} kez daha tekrarlandı: {sample.msg}"
+        summary.created = time.time()
+        summary.repeated = count - self.rate_limit_burst
+        summary.event = 'rate_limited'
+        return summary
+    
+    def _summaries(self, force=False):
+        """Süresi dolan pencereler için özet kayıtları üret"""
+        records, self._summary_pending = self._summary_pending, []
+        now = time.monotonic()
+        if not force and now - self.last_summary < self.flush_interval * 5:
+            return records
+        self.last_summary = now
+        
+        cutoff = time.time() - self.rate_limit_window
+        for key, state in list(self.recent.items()):
+            if force or state[0] <= cutoff:
+                if state[1] > self.rate_limit_burst:
+                    records.append(self._summary_record(state))
+                del self.recent[key]
+        
+        dropped = self.handler.dropped
+        if dropped > self.reported_drops:
+            records.append(logging.makeLogRecord({
+                'name': logger.name, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': f"Log kuyruğu dolu, {dropped - self.reported_drops} kayıt düşürüldü",
+                'event': 'log_dropped'
+            }))
+            self.reported_drops = dropped
+        return records
+    
+    def _write(self, records):
+        """Kayıtları tek seferde yaz"""
+        if not records:
+            return
+        self.stream.write(''.join(self.json_formatter.format(record) + '\n' for record in records))
+        self.stream.flush()
+        if self.stdout:
+            sys.stdout.write(''.join(self.text_formatter.format(record) + '\n' for record in records))
+            sys.stdout.flush()
+        if self.max_bytes and self.stream.tell() >= self.rotate_at:
+            self._rotate()
+    
+    def _rotate(self):
+        """Dosyayı .1.gz olarak sıkıştır, eski arşivleri kaydır"""
+        archived = False
+        self.stream.close()
+        try:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.log_file}.{index}.gz"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.log_file}.{index + 1}.gz")
+            
+            if self.backup_count > 0:
+                archive = f"{self.log_file}.1.gz"
+                try:
+                    with open(self.log_file, 'rb') as source, gzip.open(archive, 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                except Exception:
+                    if os.path.exists(archive):
+                        os.remove(archive)
+                    raise
+            archived = True
+            
+        except Exception as e:
+            sys.stderr.write(f"Log döndürme hatası: {e}\n")
+            
+        finally:
+            # Arşiv yazılamazsa mevcut kayıtlar silinmez, dosyaya eklemeye devam edilir
+            # ve bir sonraki deneme dosya max_bytes kadar daha büyüyünce yapılır
+            self.stream = open(self.log_file, 'w' if archived else 'a', encoding='utf-8')
+            self.rotate_at = self.max_bytes if archived else self.stream.tell() + self.max_bytes
+
+
+def setup_logging(log_file='/var/log/bot_manager/bot_manager.log', level='INFO', max_bytes=5 * 1024 * 1024, backup_count=5,
+                  rate_limit_window=60, rate_limit_burst=5, stdout=True, queue_size=10000):
+    """Loglamayı kuyruk ve tek yazıcı thread üzerinden yapılandır"""
+    log_queue = queue.Queue(maxsize=queue_size)
+    handler = QueueLogHandler(log_queue)
+    writer = LogWriter(
+        log_queue, handler, log_file,
+        max_bytes=max_bytes,
+        backup_count=backup_count,
+        rate_limit_window=rate_limit_window,
+        rate_limit_burst=rate_limit_burst,
+        stdout=stdout
+    )
+    writer.start()
+    
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    
+    atexit.register(writer.stop)
+    return writer
+
+# Node.js botlarına --require ile yüklenen canlılık betiği.
+# Olay döngüsü gecikmesini ve tik sayacını miras alınan pipe'a yazar.
+LIVENESS_PRELOAD = r"""'use strict';
+// Bot Manager canlılık ön yüklemesi (otomatik oluşturulur)
+const fs = require('fs');
+const { performance } = require('perf_hooks');
+
+const fd = parseInt(process.env.BOT_MANAGER_LIVENESS_FD, 10);
+const interval = parseInt(process.env.BOT_MANAGER_LIVENESS_INTERVAL || '1000', 10);
+delete process.env.BOT_MANAGER_LIVENESS_FD;
+
+if (!Number.isNaN(fd)) {
+    let expected = performance.now() + interval;
+    let tick = 0;
+    const timer = setInterval(() => {
+        const now = performance.now();
+        const lag = Math.max(0, Math.round(now - expected));
+        expected = now + interval;
+        tick += 1;
+        fs.write(fd, `${tick} ${lag}\n`, (error) => {
+            if (error) {
+                clearInterval(timer);
+            }
+        });
+    }, interval);
+    timer.unref();
+}
+"""
+
+
 class BotProcess:
     """Bot süreç yönetimi sınıfı"""
     
-    def __init__(self, name, script_path, working_dir):
+    # Büyük filolarda bot başına bellek kullanımını düşük tutar
+    __slots__ = (
+        'bot_id', 'name', 'script_path', 'working_dir', 'process', 'last_start',
+        'restart_count', '_status', 'draining', 'liveness', 'registry', '_ps_processes'
+    )
+    
+    def __init__(self, name, script_path, working_dir, liveness=None, bot_id=None, registry=None):
+        self.bot_id = bot_id
         self.name = name
         self.script_path = script_path
         self.working_dir = working_dir
         self.process = None
         self.last_start = None
         self.restart_count = 0
-        self.status = 'stopped'
+        self.registry = registry
+        self._status = 'stopped'
+        self.draining = False
+        self.liveness = liveness
+        self._ps_processes = {}
+    
+    @property
+    def status(self):
+        return self._status
+    
+    @status.setter
+    def status(self, value):
+        # Durum değişikliklerini kayıt defterinin indekslerine yansıt
+        old_status = self._status
+        self._status = value
+        if self.registry and old_status != value:
+            self.registry.on_status_change(self, old_status, value)
         
     def start(self):
         """Bot'u başlat"""
@@ -51,24 +362,53 @@ class BotProcess:
                 
             logger.info(f"{self.name} başlatılıyor...")
             
+            command = ['node', self.script_path]
+            env = None
+            pass_fds = ()
+            liveness_fds = None
+            
+            # Canlılık kanalı: bot'a yazma ucu miras bırakılır, okuma ucu izleyicide kalır
+            if self.liveness:
+                liveness_fds = os.pipe()
+                command = ['node', '--require', self.liveness.preload_path, self.script_path]
+                env = dict(os.environ,
+                           BOT_MANAGER_LIVENESS_FD=str(liveness_fds[1]),
+                           BOT_MANAGER_LIVENESS_INTERVAL=str(self.liveness.interval_ms))
+                pass_fds = (liveness_fds[1],)
+            
             # Node.js süreci başlat
-            self.process = subprocess.Popen(
-                ['node', self.script_path],
-                cwd=self.working_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                preexec_fn=os.setsid
-            )
+            try:
+                self.process = subprocess.Popen(
+                    command,
+                    cwd=self.working_dir,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    preexec_fn=os.setsid,
+                    env=env,
+                    pass_fds=pass_fds
+                )
+                # Önceki durumdan bağımsız olarak yeni pid hemen eşlenir
+                if self.registry:
+                    self.registry.register_pid(self)
+            except Exception:
+                if liveness_fds:
+                    os.close(liveness_fds[0])
+                    os.close(liveness_fds[1])
+                raise
+            
+            if liveness_fds:
+                os.close(liveness_fds[1])
+                self.liveness.attach(self.name, liveness_fds[0])
             
             self.last_start = datetime.now()
             self.restart_count += 1
             self.status = 'running'
             
-            logger.info(f"{self.name} başlatıldı (PID: {self.process.pid})")
+            logger.info(f"{self.name} başlatıldı (PID: {self.process.pid})", extra={'bot': self.name, 'event': 'start'})
             return True
             
         except Exception as e:
-            logger.error(f"{self.name} başlatma hatası: {e}")
+            logger.error(f"{self.name} başlatma hatası: {e}", extra={'bot': self.name, 'event': 'start_failed'})
             self.status = 'failed'
             return False
     
@@ -77,10 +417,15 @@ class BotProcess:
         try:
             if not self.is_running():
                 logger.warning(f"{self.name} zaten durmuş")
+                # Henüz işlenmemiş çökmede durum hâlâ 'running' olabilir
+                self.status = 'stopped'
                 return True
                 
             logger.info(f"{self.name} durduruluyor...")
             
+            if self.liveness:
+                self.liveness.detach(self.name)
+            
             # Süreç grubunu sonlandır
             os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
             
@@ -93,16 +438,16 @@ class BotProcess:
                 self.process.wait()
             
             self.status = 'stopped'
-            logger.info(f"{self.name} durduruldu")
+            logger.info(f"{self.name} durduruldu", extra={'bot': self.name, 'event': 'stop'})
             return True
             
         except Exception as e:
-            logger.error(f"{self.name} durdurma hatası: {e}")
+            logger.error(f"{self.name} durdurma hatası: {e}", extra={'bot': self.name, 'event': 'stop_failed'})
             return False
     
     def restart(self):
         """Bot'u yeniden başlat"""
-        logger.info(f"{self.name} yeniden başlatılıyor...")
+        logger.info(f"{self.name} yeniden başlatılıyor...", extra={'bot': self.name, 'event': 'restart'})
         self.stop()
         time.sleep(2)
         return self.start()
@@ -111,8 +456,12 @@ class BotProcess:
         """Bot çalışıyor mu kontrol et"""
         if self.process is None:
             return False
-            
-        return self.process.poll() is None
+        
+        alive = self.process.poll() is None
+        if not alive and self._status == 'running' and self.registry:
+            # Çıkışı izleme döngüsüne bildir
+            self.registry.mark_exited(self.name)
+        return alive
     
     def get_status(self):
         """Bot durumunu getir"""
@@ -122,12 +471,14 @@ class BotProcess:
             self.status = 'crashed'
             
         return {
+            'id': self.bot_id,
             'name': self.name,
             'status': self.status,
             'pid': self.process.pid if self.is_running() else None,
             'last_start': self.last_start.isoformat() if self.last_start else None,
             'restart_count': self.restart_count,
-            'uptime': self._get_uptime()
+            'uptime': self._get_uptime(),
+            'liveness': self.liveness.get_stats(self.name) if self.liveness else None
         }
     
     def _get_uptime(self):
@@ -135,6 +486,202 @@ class BotProcess:
         if not self.is_running() or not self.last_start:
             return 0
         return (datetime.now() - self.last_start).total_seconds()
+    
+    def get_usage(self):
+        """Bot'un CPU ve bellek kullanımını ölç (alt süreçler dahil)"""
+        if not self.is_running():
+            self._ps_processes = {}
+            return {'cpu_percent': 0.0, 'rss_mb': 0.0}
+        
+        try:
+            root = psutil.Process(self.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return {'cpu_percent': 0.0, 'rss_mb': 0.0}
+        
+        # CPU yüzdesi önceki ölçümden bu yana hesaplanır, bu yüzden Process nesneleri saklanır
+        cpu_percent = 0.0
+        rss = 0
+        tracked = {}
+        for proc in processes:
+            proc = self._ps_processes.get(proc.pid, proc)
+            try:
+                cpu_percent += proc.cpu_percent(None)
+                rss += proc.memory_info().rss
+                tracked[proc.pid] = proc
+            except psutil.Error:
+                pass
+        self._ps_processes = tracked
+        
+        return {
+            'cpu_percent': round(cpu_percent, 1),
+            'rss_mb': round(rss / (1024 * 1024), 1)
+        }
+
+
+class LivenessMonitor:
+    """Bot'ların olay döngüsü gecikmesini tek bir thread ile izleyen sınıf"""
+    
+    def __init__(self, on_unhealthy, preload_path, interval_ms=1000, max_lag_ms=2000,
+                 lag_breach_count=3, max_missed_ticks=5, startup_grace=30, window=120):
+        self.on_unhealthy = on_unhealthy
+        self.preload_path = preload_path
+        self.interval_ms = interval_ms
+        self.max_lag_ms = max_lag_ms
+        self.lag_breach_count = lag_breach_count
+        self.max_missed_ticks = max_missed_ticks
+        self.startup_grace = startup_grace
+        self.window = window
+        self.selector = selectors.DefaultSelector()
+        self.states = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+    
+    def install_preload(self):
+        """Canlılık betiğini diske yaz"""
+        path = Path(self.preload_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not path.exists() or path.read_text(encoding='utf-8') != LIVENESS_PRELOAD:
+            path.write_text(LIVENESS_PRELOAD, encoding='utf-8')
+    
+    def start(self):
+        """İzleme thread'ini başlat"""
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name='liveness-monitor', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """İzlemeyi durdur"""
+        self.running = False
+    
+    def attach(self, bot_name, read_fd):
+        """Yeni başlatılan bot'un canlılık kanalını izlemeye al"""
+        self.detach(bot_name)
+        os.set_blocking(read_fd, False)
+        now = time.monotonic()
+        state = {
+            'fd': read_fd,
+            'buffer': b'',
+            'lags': deque(maxlen=self.window),
+            'ticks': 0,
+            'started': now,
+            'last_tick': now,
+            'breaches': 0,
+            'reported': False
+        }
+        with self.lock:
+            self.states[bot_name] = state
+            self.selector.register(read_fd, selectors.EVENT_READ, bot_name)
+    
+    def detach(self, bot_name, fd=None):
+        """Bot'un canlılık kanalını kapat (fd verilirse yalnızca o kanal hâlâ güncelse)"""
+        with self.lock:
+            state = self.states.get(bot_name)
+            if state is None or (fd is not None and state['fd'] != fd):
+                return
+            del self.states[bot_name]
+            try:
+                self.selector.unregister(state['fd'])
+            except (KeyError, ValueError):
+                pass
+        os.close(state['fd'])
+    
+    def get_stats(self, bot_name):
+        """Gecikme yüzdeliklerini ve son tik zamanını getir"""
+        with self.lock:
+            state = self.states.get(bot_name)
+            if state is None:
+                return None
+            lags = sorted(state['lags'])
+            ticks = state['ticks']
+            last_tick_age = time.monotonic() - state['last_tick']
+        
+        def percentile(p):
+            if not lags:
+                return None
+            return lags[min(len(lags) - 1, int(len(lags) * p))]
+        
+        return {
+            'ticks': ticks,
+            'last_tick_age': round(last_tick_age, 1),
+            'lag_p50_ms': percentile(0.50),
+            'lag_p95_ms': percentile(0.95),
+            'lag_p99_ms': percentile(0.99),
+            'lag_max_ms': lags[-1] if lags else None
+        }
+    
+    def _loop(self):
+        """Canlılık döngüsü: pipe'ları okur ve eşikleri her aralıkta kontrol eder"""
+        while self.running:
+            try:
+                with self.lock:
+                    has_channels = bool(self.states)
+                if not has_channels:
+                    time.sleep(self.interval_ms / 1000)
+                    continue
+                
+                for key, _ in self.selector.select(timeout=self.interval_ms / 1000):
+                    self._read(key.data, key.fd)
+                self._evaluate()
+                
+            except Exception as e:
+                logger.error(f"Canlılık izleme hatası: {e}")
+                time.sleep(1)
+    
+    def _read(self, bot_name, fd):
+        try:
+            data = os.read(fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        
+        if not data:
+            # Süreç kapandı, çökme tespiti monitor_bots'a kalır.
+            # Bot bu arada yeniden başlatıldıysa yeni kanal kapatılmaz.
+            self.detach(bot_name, fd)
+            return
+        
+        with self.lock:
+            state = self.states.get(bot_name)
+            if state is None or state['fd'] != fd:
+                return
+            lines = (state['buffer'] + data).split(b'\n')
+            state['buffer'] = lines.pop()
+            for line in lines:
+                try:
+                    tick, lag = line.split()
+                    lag = int(lag)
+                except ValueError:
+                    continue
+                state['ticks'] = int(tick)
+                state['last_tick'] = time.monotonic()
+                state['lags'].append(lag)
+                state['breaches'] = state['breaches'] + 1 if lag > self.max_lag_ms else 0
+    
+    def _evaluate(self):
+        """Eşikleri aşan bot'ları bildir"""
+        now = time.monotonic()
+        unhealthy = []
+        with self.lock:
+            for bot_name, state in self.states.items():
+                if state['reported'] or now - state['started'] < self.startup_grace:
+                    continue
+                
+                missed = (now - state['last_tick']) * 1000 / self.interval_ms
+                if missed >= self.max_missed_ticks:
+                    reason = f"{int(missed)} tik kaçırıldı"
+                elif state['breaches'] >= self.lag_breach_count:
+                    reason = f"olay döngüsü gecikmesi {state['lags'][-1]}ms"
+                else:
+                    continue
+                
+                state['reported'] = True
+                unhealthy.append((bot_name, reason))
+        
+        for bot_name, reason in unhealthy:
+            self.on_unhealthy(bot_name, reason)
 
 
 class FileWatcher(FileSystemEventHandler):
@@ -148,36 +695,828 @@ class FileWatcher(FileSystemEventHandler):
             logger.info(f"Dosya değişti: {event.src_path}")
             # İlgili bot'u yeniden başlat
             bot_name = self._get_bot_name_from_path(event.src_path)
-            if bot_name and bot_name in self.bot_manager.bots:
-                logger.info(f"{bot_name} dosya değişikliği nedeniyle yeniden başlatılıyor")
+            if bot_name and bot_name in self.bot_manager.bots and not self.bot_manager.bots[bot_name].draining:
+                logger.info(f"{bot_name} dosya değişikliği nedeniyle yeniden başlatılıyor", extra={'bot': bot_name, 'event': 'file_changed'})
                 self.bot_manager.restart_bot(bot_name)
     
+    def on_created(self, event):
+        self._refresh(event.src_path)
+    
+    def on_deleted(self, event):
+        self._refresh(event.src_path)
+    
+    def on_moved(self, event):
+        self._refresh(event.src_path)
+        self._refresh(event.dest_path)
+    
+    def _refresh(self, path):
+        """Bot klasörü veya ana dosya adayı değiştiyse yalnızca o bot'u yeniden tara"""
+        relative = self._relative_parts(path)
+        if not relative:
+            return
+        if len(relative) == 1 or (len(relative) == 2 and BotRegistry.is_main_candidate(relative[0], relative[1])):
+            self.bot_manager.bots.refresh(relative[0])
+    
+    def _relative_parts(self, file_path):
+        try:
+            return Path(file_path).relative_to(self.bot_manager.bots_directory).parts
+        except ValueError:
+            return ()
+    
     def _get_bot_name_from_path(self, file_path):
         """Dosya yolundan bot adını çıkar"""
+        relative = self._relative_parts(file_path)
+        return relative[0] if relative else None
+
+
+class BotRegistry:
+    """Bot klasörünün artımlı güncellenen kayıt defteri"""
+    
+    MAIN_FILES = ('index.js', 'main.js', 'bot.js')
+    
+    def __init__(self, bots_directory, manifest_path, liveness=None):
+        self.bots_directory = bots_directory
+        self.manifest_path = Path(manifest_path)
+        self.liveness = liveness
+        self.lock = threading.RLock()
+        self.bots = {}
+        # Manifest: ad -> {'id', 'main_file', 'mtime_ns'}; silinen botların id'leri de saklanır
+        self.manifest = {}
+        self.next_id = 1
+        # Durum indeksleri
+        self.running = set()
+        self.crashed = set()
+        self.stopped = set()
+        self.exited = set()
+        # Son başlatılan sürecin pid'i -> bot adı (çıkan çocuk süreçleri eşlemek için)
+        self.pids = {}
+        self.bot_pids = {}
+    
+    @classmethod
+    def is_main_candidate(cls, bot_name, file_name):
+        return file_name in cls.MAIN_FILES or file_name == f'{bot_name}.js'
+    
+    # Sözlük benzeri erişim (mevcut kullanım yerleri için)
+    def __contains__(self, bot_name):
+        return bot_name in self.bots
+    
+    def __getitem__(self, bot_name):
+        return self.bots[bot_name]
+    
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.bots))
+    
+    def __len__(self):
+        return len(self.bots)
+    
+    def get(self, bot_name, default=None):
+        return self.bots.get(bot_name, default)
+    
+    def items(self):
+        with self.lock:
+            return list(self.bots.items())
+    
+    def load_manifest(self):
+        """Önceki taramanın manifestini yükle"""
         try:
-            path_parts = Path(file_path).parts
-            for i, part in enumerate(path_parts):
-                if part == 'bots' and i + 1 < len(path_parts):
-                    return path_parts[i + 1]
-        except Exception:
-            pass
+            if not self.manifest_path.exists():
+                return
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.manifest = data.get('bots', {})
+            self.next_id = data.get('next_id', 1)
+        except Exception as e:
+            logger.error(f"Bot manifesti yükleme hatası: {e}")
+    
+    def save_manifest(self):
+        """Manifesti atomik olarak kaydet"""
+        try:
+            with self.lock:
+                data = {'next_id': self.next_id, 'bots': dict(self.manifest)}
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.manifest_path)
+        except Exception as e:
+            logger.error(f"Bot manifesti kaydetme hatası: {e}")
+    
+    def rescan(self):
+        """Tüm klasörü tara; değişmeyen klasörlerde ana dosya araması atlanır"""
+        seen = set()
+        changed = False
+        try:
+            with os.scandir(self.bots_directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        seen.add(entry.name)
+                        changed |= self._scan_entry(entry.name, entry.stat().st_mtime_ns)
+        except FileNotFoundError:
+            logger.warning(f"Bot klasörü bulunamadı: {self.bots_directory}")
+            return
+        
+        with self.lock:
+            removed = [name for name in self.bots if name not in seen]
+        for bot_name in removed:
+            changed |= self._remove(bot_name)
+        
+        if changed:
+            self.save_manifest()
+    
+    def refresh(self, bot_name):
+        """Tek bir bot klasörünü yeniden tara (dosya sistemi olaylarından)"""
+        bot_dir = os.path.join(self.bots_directory, bot_name)
+        try:
+            mtime_ns = os.stat(bot_dir).st_mtime_ns
+        except FileNotFoundError:
+            changed = self._remove(bot_name)
+        else:
+            changed = self._scan_entry(bot_name, mtime_ns)
+        
+        if changed:
+            self.save_manifest()
+    
+    def _scan_entry(self, bot_name, mtime_ns):
+        """Klasör değiştiyse ana dosyayı yeniden bul, kayıt değiştiyse True döndür"""
+        with self.lock:
+            cached = self.manifest.get(bot_name)
+            bot = self.bots.get(bot_name)
+        
+        # Ana dosyası silinmiş (çalışırken kaldırılamamış) veya yolu eşleşmeyen kayıt yeniden taranır
+        if (cached and cached.get('mtime_ns') == mtime_ns and cached.get('main_file') and bot is not None
+                and bot.script_path == os.path.join(self.bots_directory, bot_name, cached['main_file'])):
+            return False
+        
+        if cached and cached.get('mtime_ns') == mtime_ns and cached.get('main_file'):
+            main_file = cached['main_file']
+        else:
+            main_file = self._find_main_file(bot_name)
+        
+        with self.lock:
+            entry = self.manifest.setdefault(bot_name, {})
+            if 'id' not in entry:
+                entry['id'] = self.next_id
+                self.next_id += 1
+            entry['mtime_ns'] = mtime_ns
+            entry['main_file'] = main_file
+            
+            if not main_file:
+                self._remove_locked(bot_name)
+                return True
+            
+            script_path = os.path.join(self.bots_directory, bot_name, main_file)
+            bot = self.bots.get(bot_name)
+            if bot is not None:
+                # Çalışan süreç korunur, yeni ana dosya bir sonraki başlatmada kullanılır
+                bot.script_path = script_path
+                return True
+            
+            bot = BotProcess(
+                name=bot_name,
+                script_path=script_path,
+                working_dir=os.path.join(self.bots_directory, bot_name),
+                liveness=self.liveness,
+                bot_id=entry['id'],
+                registry=self
+            )
+            # Başka cihaza taşınan bot ajan yeniden başlasa da boşaltılmış kalır
+            bot.draining = entry.get('draining', False)
+            self.bots[bot_name] = bot
+            self.stopped.add(bot_name)
+        
+        logger.info(f"Bot keşfedildi: {bot_name}", extra={'bot': bot_name, 'event': 'discovered'})
+        return True
+    
+    def _find_main_file(self, bot_name):
+        bot_dir = os.path.join(self.bots_directory, bot_name)
+        for file_name in self.MAIN_FILES + (f'{bot_name}.js',):
+            if os.path.exists(os.path.join(bot_dir, file_name)):
+                return file_name
         return None
+    
+    def _remove(self, bot_name):
+        with self.lock:
+            if bot_name in self.manifest:
+                # id korunur, klasör geri gelirse aynı id kullanılır
+                self.manifest[bot_name].pop('mtime_ns', None)
+                self.manifest[bot_name].pop('main_file', None)
+            return self._remove_locked(bot_name)
+    
+    def _remove_locked(self, bot_name):
+        bot = self.bots.get(bot_name)
+        if bot is None:
+            return False
+        if bot.is_running():
+            # Çalışan süreç tanıtıcısı kaybedilmez
+            logger.warning(f"Çalışan bot'un klasörü kaldırıldı, kayıt korunuyor: {bot_name}")
+            return False
+        
+        del self.bots[bot_name]
+        for index in (self.running, self.crashed, self.stopped, self.exited):
+            index.discard(bot_name)
+        self.pids.pop(self.bot_pids.pop(bot_name, None), None)
+        logger.info(f"Bot kaydı kaldırıldı: {bot_name}", extra={'bot': bot_name, 'event': 'removed'})
+        return True
+    
+    def set_draining(self, bot_name, draining):
+        """Boşaltma durumunu ayarla ve manifestte sakla; bot kayıtlıysa True döndür"""
+        with self.lock:
+            bot = self.bots.get(bot_name)
+            if bot is not None:
+                bot.draining = draining
+            entry = self.manifest.get(bot_name)
+            if entry is None or entry.get('draining', False) == draining:
+                return bot is not None
+            if draining:
+                entry['draining'] = True
+            else:
+                entry.pop('draining', None)
+        
+        self.save_manifest()
+        return bot is not None
+    
+    def on_status_change(self, bot, old_status, new_status):
+        """BotProcess durum değişikliğini indekslere yansıt"""
+        with self.lock:
+            for index in (self.running, self.crashed, self.stopped):
+                index.discard(bot.name)
+            if new_status == 'running':
+                self.running.add(bot.name)
+            elif new_status in ('crashed', 'failed'):
+                self.crashed.add(bot.name)
+            else:
+                self.stopped.add(bot.name)
+    
+    def register_pid(self, bot):
+        """Yeni başlatılan sürecin pid'ini bot'a eşle"""
+        with self.lock:
+            self.pids.pop(self.bot_pids.get(bot.name), None)
+            self.pids[bot.process.pid] = bot.name
+            self.bot_pids[bot.name] = bot.process.pid
+    
+    def running_names(self):
+        """Çalışan bot adlarının kilit altında alınmış kopyası"""
+        with self.lock:
+            return set(self.running)
+    
+    def crashed_names(self):
+        """Çöken bot adlarının kilit altında alınmış kopyası"""
+        with self.lock:
+            return set(self.crashed)
+    
+    def mark_exited(self, bot_name):
+        with self.lock:
+            self.exited.add(bot_name)
+    
+    def collect_exited(self):
+        """Çıkan süreçleri topla; yalnızca durumu değişen botlar döner"""
+        self._reap_children()
+        with self.lock:
+            exited = self.exited
+            self.exited = set()
+        return exited
+    
+    def _reap_children(self):
+        """Çıkmış çocuk süreçleri tüm botları yoklamadan bul"""
+        if not hasattr(os, 'waitid'):
+            # waitid olmayan sistemlerde çalışan botları yokla
+            self._poll_running()
+            return
+        
+        handled = set()
+        while True:
+            try:
+                # WNOWAIT: süreç Popen tarafından toplanana kadar bekletilir
+                info = os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+            except ChildProcessError:
+                return
+            if info is None or info.si_pid == 0 or info.si_pid in handled:
+                # Aynı pid tekrar geldiyse başka bir thread (stop) onu topluyor
+                return
+            handled.add(info.si_pid)
+            
+            with self.lock:
+                bot = self.bots.get(self.pids.get(info.si_pid))
+            if bot is None:
+                # Bot'a ait olmayan çocuk süreç toplanmaz (sahibi bekler); sırada kalan
+                # diğer çıkışlar kaçmasın diye çalışan botlar bu tur tek tek yoklanır
+                self._poll_running()
+                return
+            bot.is_running()
+    
+    def _poll_running(self):
+        for bot_name in self.running_names():
+            bot = self.bots.get(bot_name)
+            if bot:
+                bot.is_running()
+
+
+class BotFileSyncer:
+    """Bot dosyalarını sunucudan parça parça indiren sınıf"""
+    
+    def __init__(self, server_url, chunk_size=65536, concurrency=3, timeout=30):
+        self.server_url = server_url
+        self.chunk_size = chunk_size
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def fetch_manifest(self, bot_id):
+        """Bot dosya listesini (içeriksiz) getir"""
+        response = self.session.get(
+            f"{self.server_url}/api/bot/{bot_id}/manifest",
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            logger.error(f"Bot dosya listesi alınamadı: {bot_id} ({response.status_code})")
+            return None
+        return response.json()
+    
+    def sync(self, bot_id, bot_dir, files):
+        """Dosyaları paralel indir, (güncellenen, hatalı) listelerini döndür"""
+        bot_dir.mkdir(parents=True, exist_ok=True)
+        updated = []
+        failed = []
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {
+                pool.submit(self.sync_file, bot_id, bot_dir, file_data): file_data['file_name']
+                for file_data in files
+            }
+            for future in as_completed(futures):
+                file_name = futures[future]
+                try:
+                    if future.result():
+                        updated.append(file_name)
+                except Exception as e:
+                    logger.error(f"Dosya indirme hatası ({file_name}): {e}")
+                    failed.append(file_name)
+        
+        return updated, failed
+    
+    def sync_file(self, bot_id, bot_dir, file_data):
+        """Tek dosyayı gerekirse indir, güncellendiyse True döndür"""
+        file_path = self._safe_path(bot_dir, file_data['file_name'])
+        expected_hash = file_data.get('file_hash')
+        
+        # Mevcut dosyanın hash'ini kontrol et
+        if file_path.exists() and expected_hash:
+            if self.hash_file(file_path)[0] == expected_hash:
+                return False
+        
+        self._download(bot_id, file_data, file_path, expected_hash)
+        logger.info(f"Dosya güncellendi: {file_path}")
+        return True
+    
+    def hash_file(self, file_path, hasher=None):
+        """Dosyayı parça parça okuyarak hash'le, (hash, boyut) döndür"""
+        hasher = hasher or hashlib.sha256()
+        size = 0
+        with open(file_path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                size += len(chunk)
+        return hasher.hexdigest(), size
+    
+    def _download(self, bot_id, file_data, file_path, expected_hash):
+        """Dosyayı .part dosyasına akıt, doğrula ve yerine taşı"""
+        part_path = file_path.with_name(file_path.name + '.part')
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        hasher = hashlib.sha256()
+        offset = 0
+        headers = {}
+        
+        # Yarım kalmış indirmeye kaldığı yerden devam et
+        if part_path.exists() and expected_hash:
+            _, offset = self.hash_file(part_path, hasher)
+            if offset:
+                headers['Range'] = f"bytes={offset}-"
+                headers['If-Range'] = f'"{expected_hash}"'
+        
+        url = f"{self.server_url}/api/bot/{bot_id}/files/{file_data['id']}/raw"
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416 and offset:
+                # .part dosyası zaten tamamlanmış olabilir
+                mode = None
+            elif response.status_code == 206:
+                mode = 'ab'
+            elif response.status_code == 200:
+                hasher = hashlib.sha256()
+                mode = 'wb'
+            else:
+                raise RuntimeError(f"Sunucu yanıtı {response.status_code}")
+            
+            if mode:
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        f.write(chunk)
+                        hasher.update(chunk)
+                    f.flush()
+                    os.fsync(f.fileno())
+        
+        digest = hasher.hexdigest()
+        if expected_hash and digest != expected_hash:
+            part_path.unlink(missing_ok=True)
+            raise ValueError(f"Hash uyuşmazlığı: {file_path.name}")
+        
+        os.replace(part_path, file_path)
+    
+    def _safe_path(self, bot_dir, file_name):
+        """Bot klasörü dışına çıkan dosya yollarını engelle"""
+        file_path = (bot_dir / file_name).resolve()
+        if not file_path.is_relative_to(bot_dir.resolve()):
+            raise ValueError(f"Geçersiz dosya yolu: {file_name}")
+        return file_path
+
+
+class CronExpression:
+    """5 alanlı cron ifadesi (dakika saat gün ay haftanın-günü)"""
+    
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+    MACROS = {
+        '@hourly': '0 * * * *',
+        '@daily': '0 0 * * *',
+        '@midnight': '0 0 * * *',
+        '@weekly': '0 0 * * 0',
+        '@monthly': '0 0 1 * *',
+        '@yearly': '0 0 1 1 *',
+        '@annually': '0 0 1 1 *'
+    }
+    
+    def __init__(self, expression):
+        self.expression = expression
+        fields = self.MACROS.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Geçersiz cron ifadesi: {expression}")
+        
+        parsed = [self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = parsed
+        # Gün ve haftanın günü birlikte kısıtlıysa cron ikisinden birini yeterli sayar
+        self.days_any = fields[2] in ('*', '?')
+        self.weekdays_any = fields[4] in ('*', '?')
+    
+    def _parse_field(self, field, low, high):
+        """Tek alanı sıralı değer listesine çevir"""
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+                if step < 1:
+                    raise ValueError(f"Geçersiz adım: {field}")
+            
+            if part in ('*', '?'):
+                start, end = low, high
+            elif '-' in part:
+                start_text, end_text = part.split('-', 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            
+            if start < low or end > high or start > end:
+                raise ValueError(f"Aralık dışı değer: {field}")
+            values.update(range(start, end + 1, step))
+        
+        # Haftanın günü için 7 de pazar kabul edilir
+        if high == 7:
+            values = {value % 7 for value in values}
+        return sorted(values)
+    
+    def _day_matches(self, dt):
+        weekday = (dt.weekday() + 1) % 7
+        day_ok = dt.day in self.days
+        weekday_ok = weekday in self.weekdays
+        if self.days_any and self.weekdays_any:
+            return True
+        if self.days_any:
+            return weekday_ok
+        if self.weekdays_any:
+            return day_ok
+        return day_ok or weekday_ok
+    
+    def next_after(self, dt):
+        """Verilen zamandan sonraki ilk çalışma zamanını döndür"""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t.year + 5
+        
+        while t.year <= limit:
+            if t.month not in self.months:
+                # Bir sonraki ayın başına atla
+                year, month = (t.year + 1, 1) if t.month == 12 else (t.year, t.month + 1)
+                t = t.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                next_hour = next((h for h in self.hours if h > t.hour), None)
+                if next_hour is None:
+                    t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                else:
+                    t = t.replace(hour=next_hour, minute=0)
+                continue
+            next_minute = next((m for m in self.minutes if m >= t.minute), None)
+            if next_minute is None:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t.replace(minute=next_minute)
+        
+        raise ValueError(f"Cron ifadesi hiç eşleşmiyor: {self.expression}")
+
+
+class TaskScheduler:
+    """Zamanlanmış görevleri tek bir zamanlayıcı yığını (heap) ile çalıştıran sınıf"""
+    
+    def __init__(self, runner, cache_path, max_jitter=0, jitter_seed='', missed_grace=120,
+                 reporter=None, owner=None, workers=2):
+        self.runner = runner
+        # Görevin bu cihaza ait olup olmadığını söyler (kaçırılan çalışmalar yalnızca sahibince bildirilir)
+        self.owner = owner
+        self.cache_path = Path(cache_path)
+        self.max_jitter = max_jitter
+        self.jitter_seed = jitter_seed
+        self.missed_grace = missed_grace
+        self.reporter = reporter
+        self.tasks = {}
+        self.crons = {}
+        self.last_runs = {}
+        self.reported_missed = {}
+        # Sunucudan görev alındıktan sonra önbellek artık uygulanmaz
+        self.server_loaded = False
+        self.heap = []
+        self.generation = 0
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scheduled-task')
+        self.thread = None
+        self.running = False
+    
+    def load_cache(self):
+        """Yerel görev önbelleğini yükle (sunucu bağlantısı olmadan çalışabilmek için)"""
+        try:
+            if not self.cache_path.exists():
+                return
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            with self.condition:
+                if self.server_loaded:
+                    return
+                self.last_runs = cache.get('last_runs', {})
+            if self.set_tasks(cache.get('tasks', []), from_cache=True):
+                logger.info(f"Zamanlanmış görev önbelleği yüklendi: {len(self.tasks)} görev")
+        except Exception as e:
+            logger.error(f"Görev önbelleği yükleme hatası: {e}")
+    
+    def save_cache(self):
+        """Görevleri ve son çalışma zamanlarını atomik olarak kaydet"""
+        try:
+            with self.condition:
+                cache = {
+                    'tasks': list(self.tasks.values()),
+                    'last_runs': dict(self.last_runs)
+                }
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.error(f"Görev önbelleği kaydetme hatası: {e}")
+    
+    def set_tasks(self, tasks, from_cache=False):
+        """Görev kümesini değiştir ve zamanlayıcı yığınını yeniden kur (önbellek sunucu verisini ezmez)"""
+        now = datetime.now()
+        new_tasks = {}
+        new_crons = {}
+        for task in tasks:
+            if not task.get('is_active', True):
+                continue
+            task_id = str(task['id'])
+            try:
+                cron = CronExpression(task['cron_expression'])
+                # Sözdizimi doğru ama hiç gerçekleşmeyen tarihleri (ör. 30 Şubat) burada ele
+                cron.next_after(now)
+            except Exception as e:
+                logger.error(f"Görev atlandı ({task.get('name')}): {e}")
+                continue
+            new_crons[task_id] = cron
+            new_tasks[task_id] = task
+        
+        with self.condition:
+            if from_cache and self.server_loaded:
+                return False
+            if not from_cache:
+                self.server_loaded = True
+            self.tasks = new_tasks
+            self.crons = new_crons
+            self.last_runs = {k: v for k, v in self.last_runs.items() if k in new_tasks}
+            self.generation += 1
+            self.heap = []
+            for task_id in new_tasks:
+                self._check_missed_while_down(task_id, now)
+                self._schedule(task_id, now)
+            self.condition.notify()
+        
+        if not from_cache:
+            self.save_cache()
+        return True
+    
+    def start(self):
+        """Zamanlayıcı thread'ini başlat"""
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name='task-scheduler', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Zamanlayıcıyı durdur"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.executor.shutdown(wait=False)
+    
+    def _jitter(self, task_id):
+        """Görev ve cihaza göre sabit gecikme (filo genelinde aynı anda çalışmayı önler)"""
+        task = self.tasks[task_id]
+        max_jitter = (task.get('configuration') or {}).get('jitter_seconds', self.max_jitter)
+        if not max_jitter:
+            return 0
+        digest = hashlib.sha256(f"{self.jitter_seed}:{task_id}".encode()).digest()
+        return int.from_bytes(digest[:8], 'big') % int(max_jitter * 1000) / 1000
+    
+    def _schedule(self, task_id, after):
+        """Görevin bir sonraki çalışmasını yığına ekle (kilit tutulurken çağrılır)"""
+        try:
+            scheduled_at = self.crons[task_id].next_after(after)
+        except ValueError as e:
+            # Görev yığından düşer, diğer görevler etkilenmez
+            logger.error(f"Görev zamanlanamadı ({self.tasks[task_id].get('name')}): {e}")
+            return
+        due = scheduled_at.timestamp() + self._jitter(task_id)
+        heapq.heappush(self.heap, (due, next(self.counter), task_id, self.generation, scheduled_at))
+    
+    def _check_missed_while_down(self, task_id, now):
+        """Ajan kapalıyken kaçırılan çalışmayı tespit et (kilit tutulurken çağrılır)"""
+        last_run = self.last_runs.get(task_id) or self.tasks[task_id].get('last_run_at')
+        if not last_run:
+            return
+        try:
+            last_run_dt = datetime.fromisoformat(last_run)
+            if last_run_dt.tzinfo:
+                last_run_dt = last_run_dt.astimezone().replace(tzinfo=None)
+            expected = self.crons[task_id].next_after(last_run_dt)
+        except Exception:
+            return
+        if (now - expected).total_seconds() > self.missed_grace:
+            # Bağlantı yokken gönderilemeyen bildirim bir sonraki görev yenilemesinde tekrar denenir
+            if self.reported_missed.get(task_id) != expected and self._report_missed(task_id, expected):
+                self.reported_missed[task_id] = expected
+    
+    def _loop(self):
+        """Zamanlayıcı döngüsü: yalnızca en yakın görevin zamanına kadar uyur"""
+        with self.condition:
+            while self.running:
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                
+                wait_time = self.heap[0][0] - time.time()
+                if wait_time > 0:
+                    self.condition.wait(wait_time)
+                    continue
+                
+                # Zamanı gelen tüm görevleri tek seferde işle
+                now = datetime.now()
+                ran_any = False
+                while self.heap and self.heap[0][0] <= time.time():
+                    _, _, task_id, generation, scheduled_at = heapq.heappop(self.heap)
+                    if generation != self.generation or task_id not in self.tasks:
+                        continue
+                    
+                    task = self.tasks[task_id]
+                    lateness = (now - scheduled_at).total_seconds() - self._jitter(task_id)
+                    if lateness > self.missed_grace:
+                        self._report_missed(task_id, scheduled_at)
+                        run = (task.get('configuration') or {}).get('catch_up', False)
+                    else:
+                        run = True
+                    
+                    if run:
+                        self.last_runs[task_id] = now.isoformat()
+                        self.executor.submit(self._run, task)
+                        ran_any = True
+                    self._schedule(task_id, now)
+                
+                if ran_any:
+                    self.executor.submit(self.save_cache)
+    
+    def _run(self, task):
+        """Görevi çalıştır ve sonucu bildir"""
+        started = time.time()
+        error = None
+        try:
+            result = self.runner(task)
+        except Exception as e:
+            result = 'failure'
+            error = str(e)
+        
+        if result is None:
+            # Görev bu cihaza ait değil; sahibi olan cihazın sonucunun üzerine yazılmasın
+            return
+        
+        duration = time.time() - started
+        logger.info(f"Zamanlanmış görev çalıştı: {task.get('name')} -> {result} ({duration:.1f}s)", extra={'bot': task.get('target_bot_name'), 'event': 'scheduled_task'})
+        self._report('scheduled_task_result', {
+            'taskId': task['id'],
+            'result': result,
+            'error': error,
+            'ranAt': datetime.fromtimestamp(started).astimezone().isoformat(),
+            'durationSeconds': round(duration, 3)
+        })
+    
+    def _report_missed(self, task_id, scheduled_at):
+        """Kaçırılan çalışmayı bildir; görev bu cihaza ait değilse veya gönderilemezse False döndür"""
+        task = self.tasks[task_id]
+        if self.owner and not self.owner(task):
+            return False
+        logger.warning(f"Zamanlanmış görev kaçırıldı: {task.get('name')} ({scheduled_at.isoformat()})", extra={'bot': task.get('target_bot_name'), 'event': 'scheduled_task_missed'})
+        return self._report('scheduled_task_missed', {
+            'taskId': task['id'],
+            'scheduledAt': scheduled_at.astimezone().isoformat()
+        })
+    
+    def _report(self, event, payload):
+        if self.reporter:
+            try:
+                return self.reporter(event, payload)
+            except Exception as e:
+                logger.error(f"Görev raporu gönderilemedi: {e}")
+        return False
 
 
 class BotManager:
     """Ana bot yönetim sınıfı"""
     
-    def __init__(self, config_path='/etc/bot_manager/config.ini'):
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH):
         self.config_path = config_path
         self.config = ConfigParser()
-        self.bots = {}
+        self.bots = None
         self.running = False
         self.sio = None
         self.observer = None
         
+        # Yerleştirme komutları (atama, kaldırma, boşaltma) bot başına sıraya sokulur;
+        # Socket.IO istemcisi her olayı ayrı thread'de işler, gönderim sırasına güvenilemez
+        self.placement_guard = threading.Lock()
+        self.placement_locks = {}
+        self.placement_generations = {}
+        
         # Yapılandırmayı yükle
         self.load_config()
         
+        # Dosya senkronizasyonu
+        self.file_syncer = BotFileSyncer(
+            self.server_url,
+            chunk_size=self.sync_chunk_size,
+            concurrency=self.sync_concurrency,
+            timeout=self.sync_timeout
+        )
+        
+        # Zamanlanmış görevler
+        self.scheduler = TaskScheduler(
+            self.run_scheduled_task,
+            self.scheduler_cache,
+            max_jitter=self.scheduler_max_jitter,
+            jitter_seed=self.raspberry_name,
+            missed_grace=self.scheduler_missed_grace,
+            reporter=self._emit_report,
+            owner=self.owns_task
+        )
+        
+        # Takılan bot tespiti (isteğe bağlı)
+        self.liveness = None
+        if self.liveness_enabled:
+            self.setup_liveness()
+        
+        # Bot kayıt defteri
+        self.bots = BotRegistry(self.bots_directory, self.bots_manifest, liveness=self.liveness)
+        self.bots.load_manifest()
+        
+        # Botları keşfet ve görev önbelleğini bağlantıdan önce yükle
+        # (bağlanınca alınan güncel görevler önbellekle ezilmesin)
+        self.discover_bots()
+        if self.scheduler_enabled:
+            self.scheduler.load_cache()
+        
         # Socket.IO istemcisini başlat
         self.setup_socketio()
         
@@ -192,24 +1531,54 @@ class BotManager:
         """Yapılandırmayı yükle"""
         try:
             self.config.read(self.config_path)
+            paths = agent_paths(self.config_path, self.config)
             
             # Varsayılan değerler
             self.server_url = self.config.get('server', 'url', fallback='http://localhost:3001')
             self.bots_directory = self.config.get('bot', 'directory', fallback='/home/pi/bots')
+            self.bots_manifest = self.config.get('bot', 'manifest_file', fallback=paths['manifest_file'])
             self.auto_restart = self.config.getboolean('bot', 'auto_restart', fallback=True)
             self.heartbeat_interval = self.config.getint('system', 'heartbeat_interval', fallback=30)
             self.raspberry_name = self.config.get('system', 'name', fallback='RaspberryPi-01')
+            self.sync_chunk_size = self.config.getint('sync', 'chunk_size', fallback=65536)
+            self.sync_concurrency = self.config.getint('sync', 'concurrency', fallback=3)
+            self.sync_timeout = self.config.getint('sync', 'timeout', fallback=30)
+            self.scheduler_enabled = self.config.getboolean('scheduler', 'enabled', fallback=True)
+            self.scheduler_cache = self.config.get('scheduler', 'cache_file', fallback=paths['cache_file'])
+            self.scheduler_max_jitter = self.config.getint('scheduler', 'max_jitter', fallback=30)
+            self.scheduler_missed_grace = self.config.getint('scheduler', 'missed_grace', fallback=120)
+            self.scheduler_refresh_interval = self.config.getint('scheduler', 'refresh_interval', fallback=600)
+            self.backup_directory = self.config.get('scheduler', 'backup_directory', fallback='/home/pi/backups')
+            self.liveness_enabled = self.config.getboolean('liveness', 'enabled', fallback=False)
+            self.liveness_preload = self.config.get('liveness', 'preload_path', fallback=paths['preload_path'])
+            self.liveness_interval_ms = self.config.getint('liveness', 'interval_ms', fallback=1000)
+            self.liveness_max_lag_ms = self.config.getint('liveness', 'max_lag_ms', fallback=2000)
+            self.liveness_lag_breach_count = self.config.getint('liveness', 'lag_breach_count', fallback=3)
+            self.liveness_max_missed_ticks = self.config.getint('liveness', 'max_missed_ticks', fallback=5)
+            self.liveness_startup_grace = self.config.getint('liveness', 'startup_grace', fallback=30)
             
             logger.info(f"Yapılandırma yüklendi: {self.config_path}")
             
         except Exception as e:
             logger.error(f"Yapılandırma yükleme hatası: {e}")
             # Varsayılan değerlerle devam et
+            paths = agent_paths(self.config_path, ConfigParser())
             self.server_url = 'http://localhost:3001'
             self.bots_directory = '/home/pi/bots'
+            self.bots_manifest = paths['manifest_file']
             self.auto_restart = True
             self.heartbeat_interval = 30
             self.raspberry_name = 'RaspberryPi-01'
+            self.sync_chunk_size = 65536
+            self.sync_concurrency = 3
+            self.sync_timeout = 30
+            self.scheduler_enabled = True
+            self.scheduler_cache = paths['cache_file']
+            self.scheduler_max_jitter = 30
+            self.scheduler_missed_grace = 120
+            self.scheduler_refresh_interval = 600
+            self.backup_directory = '/home/pi/backups'
+            self.liveness_enabled = False
     
     def setup_socketio(self):
         """Socket.IO bağlantısını kur"""
@@ -221,8 +1590,11 @@ class BotManager:
                 logger.info("Sunucuya bağlandı")
                 self.sio.emit('register', {
                     'type': 'raspberry',
-                    'name': self.raspberry_name
+                    'name': self.raspberry_name,
+                    'capacity': self.get_capacity()
                 })
+                if self.scheduler_enabled:
+                    threading.Thread(target=self.fetch_scheduled_tasks, daemon=True).start()
             
             @self.sio.event
             def disconnect():
@@ -238,12 +1610,67 @@ class BotManager:
                 logger.info(f"Dosya güncelleme sinyali alındı: {data}")
                 self.sync_bot_files(data.get('botId'))
             
+            @self.sio.event
+            def botAssign(data):
+                logger.info(f"Bot atama komutu alındı: {data}")
+                return self.assign_bot(data.get('botId'), data.get('botName'))
+            
+            @self.sio.event
+            def botUnassign(data):
+                logger.info(f"Bot atama kaldırma komutu alındı: {data}")
+                return self.unassign_bot(data.get('botName'))
+            
+            @self.sio.event
+            def botDrain(data):
+                logger.info(f"Bot boşaltma komutu alındı: {data}")
+                return self.set_draining(data.get('botName'), data.get('draining', True))
+            
             # Sunucuya bağlan
             self.sio.connect(self.server_url)
             
         except Exception as e:
             logger.error(f"Socket.IO kurulum hatası: {e}")
     
+    def setup_liveness(self):
+        """Olay döngüsü canlılık izleyicisini kur"""
+        try:
+            self.liveness = LivenessMonitor(
+                self._handle_hung_bot,
+                self.liveness_preload,
+                interval_ms=self.liveness_interval_ms,
+                max_lag_ms=self.liveness_max_lag_ms,
+                lag_breach_count=self.liveness_lag_breach_count,
+                max_missed_ticks=self.liveness_max_missed_ticks,
+                startup_grace=self.liveness_startup_grace
+            )
+            self.liveness.install_preload()
+            self.liveness.start()
+            logger.info(f"Canlılık izleyici başlatıldı: {self.liveness_preload}")
+            
+        except Exception as e:
+            logger.error(f"Canlılık izleyici kurulum hatası: {e}")
+            self.liveness = None
+    
+    def _handle_hung_bot(self, bot_name, reason):
+        """Takılan bot'u bildir ve gerekirse yeniden başlat"""
+        bot = self.bots.get(bot_name)
+        if bot is None or bot.draining:
+            return
+        
+        logger.warning(f"Bot yanıt vermiyor: {bot_name} ({reason})", extra={'bot': bot_name, 'event': 'hung'})
+        
+        if self.sio and self.sio.connected:
+            self.sio.emit('bot_hung', {
+                'botName': bot_name,
+                'reason': reason,
+                'action': 'auto_restart' if self.auto_restart else 'none',
+                'timestamp': datetime.now().isoformat()
+            })
+        
+        if self.auto_restart:
+            # Yeniden başlatma saniyeler sürer, izleme thread'ini bekletme
+            threading.Thread(target=self.restart_bot, args=(bot_name,), daemon=True).start()
+    
     def setup_file_watcher(self):
         """Dosya izleyicisini kur"""
         try:
@@ -260,36 +1687,9 @@ class BotManager:
             logger.error(f"Dosya izleyici kurulum hatası: {e}")
     
     def discover_bots(self):
-        """Bot klasöründeki botları keşfet"""
+        """Bot klasöründeki botları keşfet (mevcut süreç tanıtıcıları korunur)"""
         try:
-            bots_path = Path(self.bots_directory)
-            if not bots_path.exists():
-                logger.warning(f"Bot klasörü bulunamadı: {self.bots_directory}")
-                return
-            
-            for bot_dir in bots_path.iterdir():
-                if bot_dir.is_dir():
-                    # Ana dosyayı bul
-                    main_files = [
-                        'index.js', 'main.js', 'bot.js', f'{bot_dir.name}.js'
-                    ]
-                    
-                    main_file = None
-                    for file_name in main_files:
-                        file_path = bot_dir / file_name
-                        if file_path.exists():
-                            main_file = file_path
-                            break
-                    
-                    if main_file:
-                        bot = BotProcess(
-                            name=bot_dir.name,
-                            script_path=str(main_file),
-                            working_dir=str(bot_dir)
-                        )
-                        self.bots[bot_dir.name] = bot
-                        logger.info(f"Bot keşfedildi: {bot_dir.name}")
-            
+            self.bots.rescan()
             logger.info(f"Toplam {len(self.bots)} bot keşfedildi")
             
         except Exception as e:
@@ -339,62 +1739,212 @@ class BotManager:
                 logger.error(f"Bilinmeyen aksiyon: {action}")
                 return
             
-            logger.info(f"Bot kontrol sonucu - {bot_name}: {action} -> {result}")
+            logger.info(f"Bot kontrol sonucu - {bot_name}: {action} -> {result}", extra={'bot': bot_name, 'event': 'control'})
             
         except Exception as e:
             logger.error(f"Bot kontrol hatası: {e}")
     
-    def sync_bot_files(self, bot_id):
-        """Bot dosyalarını sunucudan senkronize et"""
+    def sync_bot_files(self, bot_id, restart=True):
+        """Bot dosyalarını sunucudan senkronize et (restart=False ise bot yalnızca keşfedilir)"""
         try:
-            # Sunucudan bot bilgilerini al
-            response = requests.get(f"{self.server_url}/api/bot/{bot_id}")
-            if response.status_code != 200:
-                logger.error(f"Bot bilgileri alınamadı: {bot_id}")
-                return
+            # Sunucudan dosya listesini al (içerikler ayrı ayrı indirilir)
+            manifest = self.file_syncer.fetch_manifest(bot_id)
+            if manifest is None:
+                return False
             
-            bot_data = response.json()
-            bot_name = bot_data['bot']['name']
-            files = bot_data.get('files', [])
+            bot_name = manifest['bot']['name']
+            files = manifest.get('files', [])
             
             if not files:
                 logger.warning(f"Bot için dosya bulunamadı: {bot_name}")
-                return
+                return False
             
-            # Bot klasörünü oluştur
+            # Dosyaları güncelle
             bot_dir = Path(self.bots_directory) / bot_name
-            bot_dir.mkdir(exist_ok=True)
+            updated, failed = self.file_syncer.sync(bot_id, bot_dir, files)
             
-            # Dosyaları güncelle
-            for file_data in files:
-                file_path = bot_dir / file_data['file_name']
-                
-                # Mevcut dosyanın hash'ini kontrol et
-                current_hash = None
-                if file_path.exists():
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        current_content = f.read()
-                        current_hash = hashlib.sha256(current_content.encode()).hexdigest()
-                
-                # Hash farklıysa dosyayı güncelle
-                if current_hash != file_data.get('file_hash'):
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(file_data['file_content'])
-                    
-                    logger.info(f"Dosya güncellendi: {file_path}")
+            if failed:
+                # Yarım güncellenmiş botu başlatma, bir sonraki senkronizasyon kaldığı yerden devam eder
+                logger.error(f"Bot senkronizasyonu tamamlanamadı: {bot_name} ({len(failed)} dosya hatalı)", extra={'bot': bot_name, 'event': 'sync_failed'})
+                return False
             
-            # Bot'u yeniden keşfet ve yeniden başlat
-            if bot_name in self.bots:
-                self.restart_bot(bot_name)
+            # Bot'u yeniden keşfet ve yeniden başlat (fileUpdate tüm cihazlara gider)
+            if not restart:
+                self.bots.refresh(bot_name)
+            elif bot_name in self.bots:
+                if self.owns_bot(bot_name):
+                    self.restart_bot(bot_name)
             else:
-                self.discover_bots()
-                if bot_name in self.bots:
+                self.bots.refresh(bot_name)
+                if self.owns_bot(bot_name):
                     self.start_bot(bot_name)
             
-            logger.info(f"Bot senkronizasyonu tamamlandı: {bot_name}")
+            logger.info(f"Bot senkronizasyonu tamamlandı: {bot_name} ({len(updated)} dosya güncellendi)", extra={'bot': bot_name, 'event': 'sync'})
+            return True
             
         except Exception as e:
             logger.error(f"Dosya senkronizasyonu hatası: {e}")
+            return False
+    
+    def owns_bot(self, bot_name):
+        """Bot bu cihaza atanmış mı (klasörün varlığı yetmez, boşaltılan botlar başka cihazındır)"""
+        bot = self.bots.get(bot_name)
+        return bot is not None and not bot.draining
+    
+    def owns_task(self, task):
+        """Görev bu cihazda çalışmalı mı (hedef botu olmayan görevler her cihazda çalışır)"""
+        bot_name = task.get('target_bot_name')
+        return not bot_name or self.owns_bot(bot_name)
+    
+    def _placement_lock(self, bot_name):
+        """Bot'un yerleştirme kilidini getir"""
+        with self.placement_guard:
+            lock = self.placement_locks.get(bot_name)
+            if lock is None:
+                lock = self.placement_locks[bot_name] = threading.Lock()
+            return lock
+    
+    def _placement_generation(self, bot_name, cancel=False):
+        """Bot'un yerleştirme nesli; cancel=True sürmekte olan atamayı geçersiz kılar"""
+        with self.placement_guard:
+            if cancel:
+                self.placement_generations[bot_name] = self.placement_generations.get(bot_name, 0) + 1
+            return self.placement_generations.get(bot_name, 0)
+    
+    def assign_bot(self, bot_id, bot_name):
+        """Bot'u bu cihaza ata: dosyaları senkronize et ve başlat"""
+        generation = self._placement_generation(bot_name)
+        
+        with self._placement_lock(bot_name):
+            # Manifestteki boşaltma işareti de kaldırılır, bot yeniden keşfedilse bile bu cihazındır
+            self.bots.set_draining(bot_name, False)
+            synced = self.sync_bot_files(bot_id, restart=False)
+            
+            # Senkronizasyon sürerken atama kaldırıldıysa (ör. sunucuda zaman aşımı) bot başlatılmaz
+            cancelled = self._placement_generation(bot_name) != generation
+            if synced and not cancelled:
+                if bot_name in self.bots and self.bots[bot_name].is_running():
+                    self.restart_bot(bot_name)
+                else:
+                    self.start_bot(bot_name)
+            running = bot_name in self.bots and self.bots[bot_name].is_running()
+        
+        logger.info(f"Bot atama sonucu - {bot_name}: senkronizasyon={synced}, iptal={cancelled}, çalışıyor={running}", extra={'bot': bot_name, 'event': 'assign'})
+        return {'success': synced and running and not cancelled, 'botName': bot_name, 'device': self.raspberry_name}
+    
+    def unassign_bot(self, bot_name):
+        """Bot'un bu cihazdaki atamasını kaldır ve durdur"""
+        # Kilidi beklerken sürmekte olan atama iptal edilir, bitince bot başlatmaz
+        self._placement_generation(bot_name, cancel=True)
+        
+        with self._placement_lock(bot_name):
+            if bot_name not in self.bots:
+                return {'success': True, 'botName': bot_name, 'device': self.raspberry_name}
+            
+            # Dosya değişikliği, çökme veya ajan yeniden başlatması sonrası çalıştırılmasın
+            self.bots.set_draining(bot_name, True)
+            stopped = self.bots[bot_name].stop()
+        
+        return {'success': stopped, 'botName': bot_name, 'device': self.raspberry_name}
+    
+    def set_draining(self, bot_name, draining=True):
+        """Bot'u boşaltma moduna al (otomatik yeniden başlatma ve zamanlanmış görevler atlanır)"""
+        with self._placement_lock(bot_name):
+            found = self.bots.set_draining(bot_name, bool(draining))
+        
+        if not found:
+            logger.error(f"Bot bulunamadı: {bot_name}")
+            return {'success': False, 'botName': bot_name, 'device': self.raspberry_name}
+        
+        return {'success': True, 'botName': bot_name, 'device': self.raspberry_name}
+    
+    def fetch_scheduled_tasks(self):
+        """Zamanlanmış görevleri sunucudan al ve yerel zamanlayıcıya yükle"""
+        try:
+            response = requests.get(f"{self.server_url}/api/scheduled-tasks", timeout=10)
+            if response.status_code != 200:
+                logger.error(f"Zamanlanmış görevler alınamadı: {response.status_code}")
+                return
+            
+            tasks = response.json()
+            self.scheduler.set_tasks(tasks)
+            logger.info(f"Zamanlanmış görevler güncellendi: {len(tasks)} görev")
+            
+        except Exception as e:
+            logger.error(f"Zamanlanmış görev alma hatası: {e}")
+    
+    def run_scheduled_task(self, task):
+        """Zamanlanmış görevi çalıştır, sonucu döndür (görev bu cihaza ait değilse None)"""
+        task_type = task.get('task_type')
+        bot_name = task.get('target_bot_name')
+        configuration = task.get('configuration') or {}
+        
+        if not self.owns_task(task):
+            # Hedef bot bu cihazda değil veya başka cihaza taşındı
+            return None
+        
+        if task_type == 'bot_restart':
+            if not bot_name:
+                raise ValueError("Hedef bot belirtilmemiş")
+            return 'success' if self.restart_bot(bot_name) else 'failure'
+        
+        if task_type == 'health_check':
+            self.monitor_bots()
+            return 'success'
+        
+        if task_type == 'system_cleanup':
+            self._cleanup_partial_downloads(configuration.get('max_age_hours', 24))
+            return 'success'
+        
+        if task_type == 'backup':
+            names = [bot_name] if bot_name else list(self.bots)
+            for name in names:
+                self._backup_bot(name, configuration.get('keep', 5))
+            return 'success'
+        
+        if task_type == 'custom':
+            action = configuration.get('action')
+            if not bot_name or action not in ('start', 'stop', 'restart'):
+                raise ValueError(f"Desteklenmeyen özel görev: {action}")
+            self.handle_bot_control({'botName': bot_name, 'action': action})
+            return 'success'
+        
+        raise ValueError(f"Bilinmeyen görev tipi: {task_type}")
+    
+    def _cleanup_partial_downloads(self, max_age_hours):
+        """Eski, yarım kalmış indirme dosyalarını sil"""
+        cutoff = time.time() - max_age_hours * 3600
+        for part_path in Path(self.bots_directory).rglob('*.part'):
+            try:
+                if part_path.stat().st_mtime < cutoff:
+                    part_path.unlink()
+                    logger.info(f"Yarım indirme silindi: {part_path}")
+            except OSError as e:
+                logger.warning(f"Dosya silinemedi ({part_path}): {e}")
+    
+    def _backup_bot(self, bot_name, keep):
+        """Bot klasörünü arşivle ve eski yedekleri temizle"""
+        backup_dir = Path(self.backup_directory) / bot_name
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        archive = shutil.make_archive(
+            str(backup_dir / f"{bot_name}-{stamp}"), 'gztar',
+            root_dir=self.bots_directory, base_dir=bot_name
+        )
+        logger.info(f"Yedek oluşturuldu: {archive}")
+        
+        backups = sorted(backup_dir.glob(f"{bot_name}-*.tar.gz"))
+        for old_backup in backups[:-keep] if keep > 0 else []:
+            old_backup.unlink()
+    
+    def _emit_report(self, event, payload):
+        """Sunucuya olay bildir (bağlantı yoksa sessizce atla)"""
+        if self.sio and self.sio.connected:
+            payload = dict(payload, raspberryName=self.raspberry_name)
+            self.sio.emit(event, payload)
+            return True
+        return False
     
     def get_system_stats(self):
         """Sistem istatistiklerini getir"""
@@ -404,10 +1954,7 @@ class BotManager:
             disk = psutil.disk_usage('/')
             
             # Çalışan bot listesi
-            running_bots = []
-            for bot_name, bot in self.bots.items():
-                if bot.is_running():
-                    running_bots.append(bot_name)
+            running_bots = sorted(self.bots.running_names())
             
             return {
                 'name': self.raspberry_name,
@@ -417,13 +1964,46 @@ class BotManager:
                 'disk_usage': disk.percent,
                 'running_bots': running_bots,
                 'total_bots': len(self.bots),
-                'uptime': self._get_system_uptime()
+                'uptime': self._get_system_uptime(),
+                'capacity': self.get_capacity()
             }
             
         except Exception as e:
             logger.error(f"Sistem istatistikleri hatası: {e}")
             return {}
     
+    def get_capacity(self):
+        """Yerleştirme planlayıcısı için cihaz kapasitesini ve bot yüklerini getir"""
+        try:
+            memory = psutil.virtual_memory()
+            
+            # Durmuş botlar yük oluşturmaz, yalnızca çalışan ve çöken botlar raporlanır
+            bots = {}
+            for bot_name in self.bots.running_names() | self.bots.crashed_names():
+                bot = self.bots.get(bot_name)
+                if bot is None:
+                    continue
+                usage = bot.get_usage()
+                bots[bot_name] = {
+                    'status': bot.status,
+                    'draining': bot.draining,
+                    'cpuPercent': usage['cpu_percent'],
+                    'rssMb': usage['rss_mb']
+                }
+            
+            return {
+                'cpuCores': psutil.cpu_count() or 1,
+                'cpuUsage': psutil.cpu_percent(interval=None),
+                'loadAverage': os.getloadavg()[0],
+                'memoryTotalMb': round(memory.total / (1024 * 1024)),
+                'memoryAvailableMb': round(memory.available / (1024 * 1024)),
+                'bots': bots
+            }
+            
+        except Exception as e:
+            logger.error(f"Kapasite bilgisi hatası: {e}")
+            return {}
+    
     def _get_local_ip(self):
         """Yerel IP adresini getir"""
         try:
@@ -471,24 +2051,31 @@ class BotManager:
     def monitor_bots(self):
         """Botları izle ve gerekirse yeniden başlat"""
         try:
-            for bot_name, bot in self.bots.items():
-                if not bot.is_running() and bot.status == 'running':
-                    # Bot çökmüş
-                    bot.status = 'crashed'
-                    logger.warning(f"Bot çöktü: {bot_name}")
+            # Yalnızca süreci çıkan botlar incelenir
+            for bot_name in self.bots.collect_exited():
+                bot = self.bots.get(bot_name)
+                if bot is None or bot.process is None or bot.process.poll() is None:
+                    continue
+                if bot.status not in ('running', 'crashed'):
+                    # Bilerek durduruldu
+                    continue
+                
+                # Bot çökmüş (get_status() durumu önceden 'crashed' yapmış olabilir)
+                bot.status = 'crashed'
+                logger.warning(f"Bot çöktü: {bot_name}", extra={'bot': bot_name, 'event': 'crash'})
+                
+                # Otomatik yeniden başlatma (taşınmakta olan botlar hariç)
+                if self.auto_restart and not bot.draining:
+                    logger.info(f"Bot otomatik yeniden başlatılıyor: {bot_name}", extra={'bot': bot_name, 'event': 'auto_restart'})
+                    bot.restart()
                     
-                    # Otomatik yeniden başlatma
-                    if self.auto_restart:
-                        logger.info(f"Bot otomatik yeniden başlatılıyor: {bot_name}")
-                        bot.restart()
-                        
-                        # Sunucuya bildir
-                        if self.sio and self.sio.connected:
-                            self.sio.emit('bot_crashed', {
-                                'botName': bot_name,
-                                'action': 'auto_restart',
-                                'timestamp': datetime.now().isoformat()
-                            })
+                    # Sunucuya bildir
+                    if self.sio and self.sio.connected:
+                        self.sio.emit('bot_crashed', {
+                            'botName': bot_name,
+                            'action': 'auto_restart',
+                            'timestamp': datetime.now().isoformat()
+                        })
             
         except Exception as e:
             logger.error(f"Bot izleme hatası: {e}")
@@ -498,8 +2085,9 @@ class BotManager:
         logger.info("Bot Manager başlatılıyor...")
         self.running = True
         
-        # Botları keşfet
-        self.discover_bots()
+        # Zamanlayıcıyı başlat (önbellekteki görevlerle, sunucu bağlantısı beklemeden)
+        if self.scheduler_enabled:
+            self.scheduler.start()
         
         # Heartbeat thread'ini başlat
         heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
@@ -525,8 +2113,15 @@ class BotManager:
         logger.info("Bot Manager durduruluyor...")
         self.running = False
         
+        # Zamanlayıcıyı durdur
+        self.scheduler.stop()
+        
+        if self.liveness:
+            self.liveness.stop()
+        
         # Tüm botları durdur
-        for bot_name, bot in self.bots.items():
+        for bot_name in self.bots.running_names():
+            bot = self.bots[bot_name]
             if bot.is_running():
                 logger.info(f"Bot durduruluyor: {bot_name}")
                 bot.stop()
@@ -544,9 +2139,15 @@ class BotManager:
     
     def _heartbeat_loop(self):
         """Heartbeat döngüsü"""
+        last_task_refresh = time.monotonic()
         while self.running:
             try:
                 self.send_heartbeat()
+                
+                # Veritabanında değişen görevler yeniden bağlanmayı beklemeden alınır
+                if self.scheduler_enabled and time.monotonic() - last_task_refresh >= self.scheduler_refresh_interval:
+                    last_task_refresh = time.monotonic()
+                    threading.Thread(target=self.fetch_scheduled_tasks, daemon=True).start()
                 time.sleep(self.heartbeat_interval)
             except Exception as e:
                 logger.error(f"Heartbeat döngü hatası: {e}")
@@ -570,12 +2171,18 @@ class BotManager:
 
 def main():
     """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Bot Manager')
+    parser.add_argument('--config', '-c', default=DEFAULT_CONFIG_PATH,
+                        help='Yapılandırma dosyası (aynı makinede birden fazla ajan için, her ajana ayrı [system] name verin)')
+    args = parser.parse_args()
+    
     try:
         # Yapılandırma dosyasını kontrol et
-        config_path = '/etc/bot_manager/config.ini'
+        config_path = args.config
+        created = False
         if not os.path.exists(config_path):
             # Varsayılan yapılandırma oluştur
-            os.makedirs('/etc/bot_manager', exist_ok=True)
+            os.makedirs(os.path.dirname(os.path.abspath(config_path)), exist_ok=True)
             with open(config_path, 'w') as f:
                 f.write("""[server]
 url = http://localhost:3001
@@ -588,6 +2195,21 @@ auto_restart = true
 heartbeat_interval = 30
 name = RaspberryPi-01
 """)
+            created = True
+        
+        # Loglamayı BotManager'dan önce kur ki yapılandırma mesajları da kaydedilsin
+        config = ConfigParser()
+        config.read(config_path)
+        setup_logging(
+            log_file=config.get('logging', 'file', fallback=agent_paths(config_path, config)['log_file']),
+            level=config.get('system', 'log_level', fallback='INFO'),
+            max_bytes=config.getint('logging', 'max_bytes', fallback=5 * 1024 * 1024),
+            backup_count=config.getint('logging', 'backup_count', fallback=5),
+            rate_limit_window=config.getint('logging', 'rate_limit_window', fallback=60),
+            rate_limit_burst=config.getint('logging', 'rate_limit_burst', fallback=5),
+            stdout=config.getboolean('logging', 'stdout', fallback=True)
+        )
+        if created:
             logger.info(f"Varsayılan yapılandırma oluşturuldu: {config_path}")
         
         # Bot manager'ı başlat
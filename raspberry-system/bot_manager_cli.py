@@ -2,16 +2,33 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import gzip
 import json
 import requests
 import sys
+import os
+import re
+from collections import deque
+from configparser import ConfigParser
 from pathlib import Path
 
+DEFAULT_CONFIG_PATH = '/etc/bot_manager/config.ini'
+
 class BotManagerCLI:
     """Bot Manager komut satırı arayüzü"""
     
-    def __init__(self):
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH):
         self.base_url = "http://localhost:3001/api"
+        self.config_path = config_path
+        self.config = ConfigParser()
+        self.config.read(config_path)
+    
+    def default_log_file(self):
+        """Ajanın varsayılan log dosyası (bot_manager.py agent_paths ile aynı kural)"""
+        if os.path.abspath(self.config_path) == DEFAULT_CONFIG_PATH:
+            return '/var/log/bot_manager/bot_manager.log'
+        agent_name = self.config.get('system', 'name', fallback=Path(self.config_path).stem)
+        return f"/var/log/bot_manager/{re.sub(r'[^A-Za-z0-9_.-]', '_', agent_name)}.log"
     
     def list_bots(self):
         """Botları listele"""
@@ -100,32 +117,81 @@ class BotManagerCLI:
         
         return True
     
-    def show_logs(self, lines=50):
+    def show_logs(self, lines=50, bot_name=None, event=None):
         """Log dosyasını göster"""
         try:
-            log_file = Path('/var/log/bot_manager.log')
-            if not log_file.exists():
+            log_file = Path(self.config.get('logging', 'file', fallback=self.default_log_file()))
+            
+            # Güncel dosya, ardından yeniden eskiye .1.gz, .2.gz ... arşivleri
+            sources = [log_file]
+            index = 1
+            while Path(f"{log_file}.{index}.gz").exists():
+                sources.append(Path(f"{log_file}.{index}.gz"))
+                index += 1
+            sources = [source for source in sources if source.exists()]
+            
+            if not sources:
                 print("Log dosyası bulunamadı")
                 return False
             
-            # Son N satırı göster
-            with open(log_file, 'r') as f:
-                all_lines = f.readlines()
-                last_lines = all_lines[-lines:]
+            # Son N satırı göster; güncel dosyada yeterli satır yoksa arşivlere geri dön
+            # (dosyaların tamamı belleğe alınmaz)
+            last_lines = []
+            for source in sources:
+                opener = gzip.open if source.suffix == '.gz' else open
+                with opener(source, 'rt', encoding='utf-8', errors='replace') as f:
+                    matched = deque(
+                        (line for line in f if self._log_matches(line, bot_name, event)),
+                        maxlen=lines - len(last_lines)
+                    )
+                last_lines = list(matched) + last_lines
+                if len(last_lines) >= lines:
+                    break
                 
             for line in last_lines:
-                print(line.rstrip())
+                print(self._format_log_line(line))
             
         except Exception as e:
             print(f"Hata: {e}")
             return False
         
         return True
+    
+    def _parse_log_line(self, line):
+        """JSON log satırını çözümle, eski düz metin satırlar için None döndür"""
+        if not line.startswith('{'):
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+    
+    def _log_matches(self, line, bot_name, event):
+        if not bot_name and not event:
+            return True
+        entry = self._parse_log_line(line)
+        if entry is None:
+            return False
+        return (not bot_name or entry.get('bot') == bot_name) and (not event or entry.get('event') == event)
+    
+    def _format_log_line(self, line):
+        """JSON log kaydını okunabilir satıra çevir"""
+        entry = self._parse_log_line(line)
+        if entry is None:
+            return line.rstrip()
+        
+        time_text = entry.get('time', '').replace('T', ' ')
+        bot_text = f" [{entry['bot']}]" if entry.get('bot') else ''
+        text = f"{time_text} - {entry.get('level', '')}{bot_text} - {entry.get('message', '')}"
+        if entry.get('exception'):
+            text += f"\n{entry['exception']}"
+        return text
 
 
 def main():
     """Ana fonksiyon"""
     parser = argparse.ArgumentParser(description='Bot Manager CLI')
+    parser.add_argument('--config', '-c', default=DEFAULT_CONFIG_PATH, help='Yapılandırma dosyası')
     subparsers = parser.add_subparsers(dest='command', help='Komutlar')
     
     # List komutu
@@ -150,6 +216,8 @@ def main():
     # Logs komutu
     logs_parser = subparsers.add_parser('logs', help='Logları göster')
     logs_parser.add_argument('--lines', '-n', type=int, default=50, help='Gösterilecek satır sayısı')
+    logs_parser.add_argument('--bot', '-b', help='Sadece bu bota ait kayıtlar')
+    logs_parser.add_argument('--event', '-e', help='Sadece bu olay tipindeki kayıtlar')
     
     args = parser.parse_args()
     
@@ -157,7 +225,7 @@ def main():
         parser.print_help()
         return
     
-    cli = BotManagerCLI()
+    cli = BotManagerCLI(args.config)
     
     if args.command == 'list':
         cli.list_bots()
@@ -170,7 +238,7 @@ def main():
     elif args.command == 'restart':
         cli.control_bot(args.bot_name, 'restart')
     elif args.command == 'logs':
-        cli.show_logs(args.lines)
+        cli.show_logs(args.lines, args.bot, args.event)
 
 
 if __name__ == '__main__':
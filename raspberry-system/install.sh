@@ -14,17 +14,21 @@ echo "Bot klasörü oluşturuluyor..."
 sudo mkdir -p /home/pi/bots
 sudo chown pi:pi /home/pi/bots
 
-# Log klasörünü oluştur
+# Log klasörünü oluştur (döndürülen .gz arşivleri de burada tutulur)
 echo "Log klasörü oluşturuluyor..."
-sudo mkdir -p /var/log
-sudo touch /var/log/bot_manager.log
-sudo chown pi:pi /var/log/bot_manager.log
+sudo mkdir -p /var/log/bot_manager
+sudo chown pi:pi /var/log/bot_manager
 
 # Yapılandırma klasörünü oluştur
 echo "Yapılandırma klasörü oluşturuluyor..."
 sudo mkdir -p /etc/bot_manager
 sudo chown pi:pi /etc/bot_manager
 
+# Durum klasörünü oluştur (zamanlanmış görev önbelleği)
+echo "Durum klasörü oluşturuluyor..."
+sudo mkdir -p /var/lib/bot_manager
+sudo chown pi:pi /var/lib/bot_manager
+
 # Ana scripti kopyala
 echo "Ana script kopyalanıyor..."
 sudo cp bot_manager.py /usr/local/bin/bot_manager
@@ -72,4 +76,4 @@ echo "  Logları göster: sudo journalctl -u bot-manager -f"
 echo ""
 echo "Yapılandırma dosyası: /etc/bot_manager/config.ini"
 echo "Bot klasörü: /home/pi/bots"
-echo "Log dosyası: /var/log/bot_manager.log"
\ No newline at end of file
+echo "Log dosyası: /var/log/bot_manager/bot_manager.log"
\ No newline at end of file
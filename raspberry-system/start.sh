@@ -22,11 +22,11 @@ if [ ! -f "/etc/bot_manager/config.ini" ]; then
     cp config.ini /etc/bot_manager/config.ini
 fi
 
-# Log dosyasının varlığını kontrol et
-if [ ! -f "/var/log/bot_manager.log" ]; then
-    echo "Log dosyası oluşturuluyor..."
-    sudo touch /var/log/bot_manager.log
-    sudo chown pi:pi /var/log/bot_manager.log
+# Log klasörünün varlığını kontrol et
+if [ ! -d "/var/log/bot_manager" ]; then
+    echo "Log klasörü oluşturuluyor..."
+    sudo mkdir -p /var/log/bot_manager
+    sudo chown pi:pi /var/log/bot_manager
 fi
 
 # Python paketlerinin kurulu olup olmadığını kontrol et
@@ -27,12 +27,14 @@ echo
 if [[ $REPLY =~ ^[Yy]$ ]]; then
     echo "Yapılandırma dosyaları siliniyor..."
     sudo rm -rf /etc/bot_manager
+    sudo rm -rf /var/lib/bot_manager
 fi
 
 read -p "Log dosyalarını silmek istiyor musunuz? (y/N): " -n 1 -r
 echo
 if [[ $REPLY =~ ^[Yy]$ ]]; then
     echo "Log dosyaları siliniyor..."
+    sudo rm -rf /var/log/bot_manager
     sudo rm -f /var/log/bot_manager.log
 fi
 
@@ -0,0 +1,166 @@
+// Bot yerleştirme planlayıcısı
+// Raspberry Pi ajanlarının bildirdiği kapasite ve bot başına ölçülen CPU/RSS
+// değerlerine göre botları cihazlara dağıtır. Saf fonksiyonlardan oluşur,
+// veritabanı veya Socket.IO bağlantısı gerektirmez.
+
+const DEFAULT_OPTIONS = {
+    // Bu oranın üstündeki cihazlar aşırı yüklü sayılır
+    maxCpuRatio: 0.8,
+    maxMemoryRatio: 0.85,
+    // Taşıma sonrası hedef cihazda bırakılacak pay
+    targetCpuRatio: 0.7,
+    targetMemoryRatio: 0.75,
+    // Ölçümü olmayan yeni botlar için varsayılan yük
+    defaultBotCpuPercent: 10,
+    defaultBotRssMb: 80
+};
+
+// Ajan kapasite raporunu planlayıcı modeline çevir
+function buildDeviceModel(name, capacity, options) {
+    const cpuCapacity = (capacity.cpuCores || 1) * 100;
+    const memoryTotal = capacity.memoryTotalMb || 0;
+    const bots = {};
+    let botCpu = 0;
+    let botMemory = 0;
+
+    for (const [botName, bot] of Object.entries(capacity.bots || {})) {
+        if (bot.status !== 'running' || bot.draining) {
+            continue;
+        }
+        bots[botName] = { cpu: bot.cpuPercent || 0, memory: bot.rssMb || 0 };
+        botCpu += bots[botName].cpu;
+        botMemory += bots[botName].memory;
+    }
+
+    // Bot dışı yük (sistem, ajanın kendisi) cihazın taban yükü olarak kalır
+    const usedMemory = memoryTotal - (capacity.memoryAvailableMb || 0);
+    const measuredCpu = (capacity.cpuUsage || 0) / 100 * cpuCapacity;
+
+    return {
+        name,
+        cpuCapacity,
+        memoryCapacity: memoryTotal,
+        baseCpu: Math.max(measuredCpu - botCpu, 0),
+        baseMemory: Math.max(usedMemory - botMemory, 0),
+        bots,
+        cpu: Math.max(measuredCpu, botCpu),
+        memory: Math.max(usedMemory, botMemory),
+        options
+    };
+}
+
+function fits(device, load, cpuRatio, memoryRatio) {
+    return device.cpu + load.cpu <= device.cpuCapacity * cpuRatio
+        && device.memory + load.memory <= device.memoryCapacity * memoryRatio;
+}
+
+function isOverloaded(device) {
+    return device.cpu > device.cpuCapacity * device.options.maxCpuRatio
+        || device.memory > device.memoryCapacity * device.options.maxMemoryRatio;
+}
+
+// Baskın kaynak payı: botun cihaz kapasitesine göre en büyük oranı
+function dominantShare(device, load) {
+    return Math.max(
+        device.cpuCapacity ? load.cpu / device.cpuCapacity : 0,
+        device.memoryCapacity ? load.memory / device.memoryCapacity : 0
+    );
+}
+
+// En iyi uyum: sığdığı cihazlar arasında en az boş kapasite bırakanı seç
+function bestFit(devices, load, exclude) {
+    let best = null;
+    let bestSlack = Infinity;
+
+    for (const device of devices) {
+        if (device.name === exclude) {
+            continue;
+        }
+        const { targetCpuRatio, targetMemoryRatio } = device.options;
+        if (!fits(device, load, targetCpuRatio, targetMemoryRatio)) {
+            continue;
+        }
+        const slack = Math.max(
+            1 - (device.cpu + load.cpu) / device.cpuCapacity,
+            1 - (device.memory + load.memory) / device.memoryCapacity
+        );
+        if (slack < bestSlack) {
+            best = device;
+            bestSlack = slack;
+        }
+    }
+
+    return best;
+}
+
+function applyMove(from, to, botName, load) {
+    if (from) {
+        delete from.bots[botName];
+        from.cpu -= load.cpu;
+        from.memory -= load.memory;
+    }
+    to.bots[botName] = load;
+    to.cpu += load.cpu;
+    to.memory += load.memory;
+}
+
+// Yerleştirme planı oluştur
+// devices: [{ name, capacity }] (capacity ajanın get_capacity() çıktısı)
+// unplacedBots: [{ name, cpuPercent?, rssMb? }] henüz hiçbir cihazda çalışmayan botlar
+// Dönüş: { assignments: [{ botName, to }], migrations: [{ botName, from, to }], unplaceable: [botName] }
+function planPlacement(devices, unplacedBots = [], userOptions = {}) {
+    const options = { ...DEFAULT_OPTIONS, ...userOptions };
+    const models = devices.map((device) => buildDeviceModel(device.name, device.capacity || {}, options));
+    const assignments = [];
+    const migrations = [];
+    const unplaceable = [];
+
+    // Yeni botlar: büyükten küçüğe en iyi uyum (best-fit decreasing)
+    const pending = unplacedBots.map((bot) => ({
+        name: bot.name,
+        load: {
+            cpu: bot.cpuPercent ?? options.defaultBotCpuPercent,
+            memory: bot.rssMb ?? options.defaultBotRssMb
+        }
+    }));
+    pending.sort((a, b) => (b.load.cpu / 100 + b.load.memory / 1024) - (a.load.cpu / 100 + a.load.memory / 1024));
+
+    for (const bot of pending) {
+        const target = bestFit(models, bot.load, null);
+        if (!target) {
+            unplaceable.push(bot.name);
+            continue;
+        }
+        applyMove(null, target, bot.name, bot.load);
+        assignments.push({ botName: bot.name, to: target.name });
+    }
+
+    // Aşırı yüklü cihazlardan en büyük botları taşı
+    for (const device of models) {
+        if (!isOverloaded(device)) {
+            continue;
+        }
+
+        const candidates = Object.entries(device.bots)
+            .sort(([, a], [, b]) => dominantShare(device, b) - dominantShare(device, a));
+
+        for (const [botName, load] of candidates) {
+            if (!isOverloaded(device)) {
+                break;
+            }
+            const target = bestFit(models.filter((model) => !isOverloaded(model)), load, device.name);
+            if (!target) {
+                continue;
+            }
+            applyMove(device, target, botName, load);
+            migrations.push({ botName, from: device.name, to: target.name });
+        }
+    }
+
+    return { assignments, migrations, unplaceable };
+}
+
+module.exports = {
+    DEFAULT_OPTIONS,
+    planPlacement
+};
@@ -7,6 +7,7 @@ const http = require('http');
 const socketIo = require('socket.io');
 const crypto = require('crypto');
 const axios = require('axios');
+const { planPlacement } = require('./placement');
 
 const app = express();
 const server = http.createServer(app);
@@ -45,6 +46,31 @@ io.on('connection', (socket) => {
         connectedClients.set(socket.id, data);
     });
     
+    // Raspberry Pi zamanlanmış görev sonuçları
+    socket.on('scheduled_task_result', async (data) => {
+        try {
+            await dbPool.execute(
+                'UPDATE scheduled_tasks SET last_run_at = ?, last_result = ?, last_error_message = ? WHERE id = ?',
+                [new Date(data.ranAt), data.result, data.error || null, data.taskId]
+            );
+        } catch (error) {
+            console.error('Görev sonucu kaydetme hatası:', error);
+        }
+    });
+    
+    // Raspberry Pi kapasite güncellemesi (yerleştirme planlayıcısı için)
+    socket.on('raspberry_heartbeat', (data) => {
+        const client = connectedClients.get(socket.id);
+        if (client && data && data.capacity) {
+            client.capacity = data.capacity;
+            client.lastHeartbeat = Date.now();
+        }
+    });
+    
+    socket.on('scheduled_task_missed', (data) => {
+        console.warn(`Zamanlanmış görev kaçırıldı: ${data.taskId} (${data.raspberryName}, ${data.scheduledAt})`);
+    });
+    
     socket.on('disconnect', () => {
         connectedClients.delete(socket.id);
         console.log('Client bağlantısı kesildi:', socket.id);
@@ -195,6 +221,118 @@ app.get('/api/bot/:id', async (req, res) => {
     }
 });
 
+// Bot dosya listesi endpoint'i (içeriksiz, Raspberry Pi senkronizasyonu için)
+app.get('/api/bot/:id/manifest', async (req, res) => {
+    try {
+        const { id } = req.params;
+        const connection = await dbPool.getConnection();
+        
+        try {
+            const [botRows] = await connection.execute(
+                'SELECT id, name, main_file FROM bots WHERE id = ?',
+                [id]
+            );
+            
+            if (botRows.length === 0) {
+                return res.status(404).json({ error: 'Bot bulunamadı' });
+            }
+            
+            const [filesRows] = await connection.execute(
+                'SELECT id, file_path, file_name, file_hash, file_size, encoding, is_main_file FROM bot_files WHERE bot_id = ?',
+                [id]
+            );
+            
+            res.json({
+                bot: botRows[0],
+                files: filesRows
+            });
+            
+        } finally {
+            connection.release();
+        }
+        
+    } catch (error) {
+        console.error('Bot manifest hatası:', error);
+        res.status(500).json({ error: 'Sunucu hatası' });
+    }
+});
+
+// Bot dosyası ham içerik endpoint'i (Range destekli, ikili dosyalar için güvenli)
+app.get('/api/bot/:id/files/:fileId/raw', async (req, res) => {
+    try {
+        const { id, fileId } = req.params;
+        const connection = await dbPool.getConnection();
+        
+        try {
+            const [rows] = await connection.execute(
+                'SELECT file_content, file_hash, encoding FROM bot_files WHERE bot_id = ? AND id = ?',
+                [id, fileId]
+            );
+            
+            if (rows.length === 0) {
+                return res.status(404).json({ error: 'Dosya bulunamadı' });
+            }
+            
+            const file = rows[0];
+            const data = decodeFileContent(file.file_content, file.encoding);
+            const etag = `"${file.file_hash}"`;
+            
+            res.set({
+                'Accept-Ranges': 'bytes',
+                'Content-Type': 'application/octet-stream',
+                'ETag': etag
+            });
+            
+            // If-Range eşleşmiyorsa dosyanın tamamını gönder
+            const ifRange = req.headers['if-range'];
+            const range = (!ifRange || ifRange === etag) ? parseByteRange(req.headers.range, data.length) : null;
+            
+            if (range === false) {
+                res.set('Content-Range', `bytes */${data.length}`);
+                return res.status(416).end();
+            }
+            
+            if (range) {
+                res.status(206).set({
+                    'Content-Range': `bytes ${range.start}-${range.end}/${data.length}`,
+                    'Content-Length': range.end - range.start + 1
+                });
+                return res.end(data.subarray(range.start, range.end + 1));
+            }
+            
+            res.set('Content-Length', data.length);
+            res.end(data);
+            
+        } finally {
+            connection.release();
+        }
+        
+    } catch (error) {
+        console.error('Dosya indirme hatası:', error);
+        res.status(500).json({ error: 'Sunucu hatası' });
+    }
+});
+
+// Zamanlanmış görev listesi endpoint'i (Raspberry Pi zamanlayıcısı için)
+app.get('/api/scheduled-tasks', async (req, res) => {
+    try {
+        const [rows] = await dbPool.execute(`
+            SELECT st.id, st.name, st.task_type, st.cron_expression, st.target_bot_id,
+                   b.name AS target_bot_name, st.configuration, st.max_runtime_seconds,
+                   st.retry_attempts, st.is_active, st.last_run_at
+            FROM scheduled_tasks st
+            LEFT JOIN bots b ON b.id = st.target_bot_id
+            WHERE st.is_active = TRUE
+        `);
+        
+        res.json(rows);
+        
+    } catch (error) {
+        console.error('Zamanlanmış görev listesi hatası:', error);
+        res.status(500).json({ error: 'Sunucu hatası' });
+    }
+});
+
 // Profil oluşturma endpoint'i
 app.post('/api/profiles', async (req, res) => {
     try {
@@ -341,11 +479,13 @@ app.post('/api/bot/:id/files', async (req, res) => {
             
             // Yeni dosyaları ekle
             for (const file of files) {
-                const fileHash = crypto.createHash('sha256').update(file.content).digest('hex');
+                const encoding = file.encoding === 'base64' ? 'base64' : 'utf-8';
+                const data = decodeFileContent(file.content, encoding);
+                const fileHash = crypto.createHash('sha256').update(data).digest('hex');
                 
                 await connection.execute(
-                    'INSERT INTO bot_files (bot_id, file_path, file_name, file_content, file_hash) VALUES (?, ?, ?, ?, ?)',
-                    [id, file.path, file.name, file.content, fileHash]
+                    'INSERT INTO bot_files (bot_id, file_path, file_name, file_content, file_hash, file_size, encoding) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [id, file.path, file.name, file.content, fileHash, data.length, encoding]
                 );
             }
             
@@ -462,6 +602,195 @@ app.post('/api/raspberry/heartbeat', async (req, res) => {
     }
 });
 
+// Veritabanındaki dosya içeriğini byte dizisine çevir
+function decodeFileContent(content, encoding) {
+    if (content === null || content === undefined) {
+        return Buffer.alloc(0);
+    }
+    return Buffer.from(content, encoding === 'base64' ? 'base64' : 'utf8');
+}
+
+// Tek aralıklı "bytes=start-end" başlığını çözümle
+// null: aralık yok/geçersiz, false: karşılanamaz aralık
+function parseByteRange(header, total) {
+    if (!header) {
+        return null;
+    }
+    
+    const match = /^bytes=(\d*)-(\d*)$/.exec(header.trim());
+    if (!match || (match[1] === '' && match[2] === '')) {
+        return null;
+    }
+    
+    let start;
+    let end;
+    if (match[1] === '') {
+        // Son N byte
+        start = Math.max(total - parseInt(match[2], 10), 0);
+        end = total - 1;
+    } else {
+        start = parseInt(match[1], 10);
+        end = match[2] === '' ? total - 1 : Math.min(parseInt(match[2], 10), total - 1);
+    }
+    
+    if (start >= total || start > end) {
+        return false;
+    }
+    return { start, end };
+}
+
+// Yerleştirme planı endpoint'i (sadece plan, taşıma yapmaz)
+app.get('/api/placement/plan', async (req, res) => {
+    try {
+        res.json({
+            devices: getRaspberryAgents().map(({ name, capacity }) => ({ name, capacity })),
+            plan: planPlacement(getRaspberryAgents())
+        });
+    } catch (error) {
+        console.error('Yerleştirme planı hatası:', error);
+        res.status(500).json({ error: 'Sunucu hatası' });
+    }
+});
+
+// Aşırı yüklü cihazlardan botları taşı
+app.post('/api/placement/rebalance', async (req, res) => {
+    try {
+        const results = await rebalanceBots();
+        res.json({ success: results.every((result) => result.success), migrations: results });
+    } catch (error) {
+        console.error('Yeniden dengeleme hatası:', error);
+        res.status(500).json({ error: 'Sunucu hatası' });
+    }
+});
+
+// Botu belirli bir cihaza ata (veya planlayıcıya seçtir)
+app.post('/api/bot/:id/assign', async (req, res) => {
+    try {
+        const { id } = req.params;
+        const { device } = req.body;
+        
+        const [botRows] = await dbPool.execute('SELECT id, name FROM bots WHERE id = ?', [id]);
+        if (botRows.length === 0) {
+            return res.status(404).json({ error: 'Bot bulunamadı' });
+        }
+        
+        const bot = botRows[0];
+        const agents = getRaspberryAgents();
+        const current = agents.find((agent) => isBotRunningOn(agent, bot.name));
+        
+        let target = device;
+        if (!target) {
+            const { assignments } = planPlacement(agents.filter((agent) => agent !== current), [{ name: bot.name }]);
+            target = assignments.length > 0 ? assignments[0].to : null;
+        }
+        if (!target) {
+            return res.status(409).json({ error: 'Uygun cihaz bulunamadı' });
+        }
+        
+        if (current && current.name === target) {
+            // Bot zaten bu cihazda çalışıyor, taşıma botu durdurur
+            return res.json({ botName: bot.name, to: target, success: true, message: 'Bot zaten bu cihazda' });
+        }
+        
+        const result = current
+            ? await migrateBot(bot, current.name, target)
+            : await assignBot(bot, target);
+        res.status(result.success ? 200 : 502).json(result);
+        
+    } catch (error) {
+        console.error('Bot atama hatası:', error);
+        res.status(500).json({ error: 'Sunucu hatası' });
+    }
+});
+
+const PLACEMENT_ACK_TIMEOUT = parseInt(process.env.PLACEMENT_ACK_TIMEOUT || '120000', 10);
+
+// Bağlı Raspberry Pi ajanları
+function getRaspberryAgents() {
+    const agents = [];
+    for (const [socketId, client] of connectedClients) {
+        if (client && client.type === 'raspberry') {
+            agents.push({ socketId, name: client.name, capacity: client.capacity || {} });
+        }
+    }
+    return agents;
+}
+
+function isBotRunningOn(agent, botName) {
+    const bot = (agent.capacity.bots || {})[botName];
+    return Boolean(bot && bot.status === 'running');
+}
+
+// Belirli bir ajana komut gönder ve yanıtını bekle
+async function sendAgentCommand(deviceName, event, payload) {
+    const agent = getRaspberryAgents().find((item) => item.name === deviceName);
+    if (!agent) {
+        return { success: false, error: `Cihaz bağlı değil: ${deviceName}` };
+    }
+    
+    const socket = io.sockets.sockets.get(agent.socketId);
+    if (!socket) {
+        return { success: false, error: `Cihaz bağlı değil: ${deviceName}` };
+    }
+    
+    try {
+        const response = await socket.timeout(PLACEMENT_ACK_TIMEOUT).emitWithAck(event, payload);
+        return response || { success: false, error: 'Boş yanıt' };
+    } catch (error) {
+        return { success: false, error: `Yanıt alınamadı: ${event}` };
+    }
+}
+
+async function assignBot(bot, targetName) {
+    const result = await sendAgentCommand(targetName, 'botAssign', { botId: bot.id, botName: bot.name });
+    return { botName: bot.name, to: targetName, success: Boolean(result.success), error: result.error };
+}
+
+// Boşalt -> senkronize et -> başlat -> durdur sırasıyla botu taşı
+async function migrateBot(bot, fromName, toName) {
+    const migration = { botName: bot.name, from: fromName, to: toName, success: false };
+    
+    const drained = await sendAgentCommand(fromName, 'botDrain', { botName: bot.name, draining: true });
+    if (!drained.success) {
+        return { ...migration, error: drained.error || 'Boşaltma başarısız' };
+    }
+    
+    // Hedef cihaz dosyaları indirip botu başlatır
+    const assigned = await sendAgentCommand(toName, 'botAssign', { botId: bot.id, botName: bot.name });
+    if (!assigned.success) {
+        // Hedef yanıt vermese de senkronizasyonu bitirip botu başlatabilir; iki cihazda çalışmasın
+        await sendAgentCommand(toName, 'botUnassign', { botName: bot.name });
+        // Kaynak cihazda çalışmaya devam etsin
+        await sendAgentCommand(fromName, 'botDrain', { botName: bot.name, draining: false });
+        return { ...migration, error: assigned.error || 'Hedef cihazda başlatılamadı' };
+    }
+    
+    const stopped = await sendAgentCommand(fromName, 'botUnassign', { botName: bot.name });
+    if (!stopped.success) {
+        console.warn(`Bot kaynak cihazda durdurulamadı: ${bot.name} (${fromName})`);
+    }
+    
+    console.log(`Bot taşındı: ${bot.name} ${fromName} -> ${toName}`);
+    return { ...migration, success: true };
+}
+
+async function rebalanceBots() {
+    const { migrations } = planPlacement(getRaspberryAgents());
+    const results = [];
+    
+    // Taşımalar sırayla yapılır, aynı anda tek bot el değiştirir
+    for (const migration of migrations) {
+        const [botRows] = await dbPool.execute('SELECT id, name FROM bots WHERE name = ?', [migration.botName]);
+        if (botRows.length === 0) {
+            results.push({ ...migration, success: false, error: 'Bot bulunamadı' });
+            continue;
+        }
+        results.push(await migrateBot(botRows[0], migration.from, migration.to));
+    }
+    
+    return results;
+}
+
 // Bildirim gönderme fonksiyonu
 async function sendStatusChangeNotification(connection, botId, botName, newStatus, oldStatus) {
     try {
@@ -557,6 +886,20 @@ cron.schedule('*/30 * * * * *', async () => {
     }
 });
 
+// Otomatik yeniden dengeleme (PLACEMENT_AUTO_REBALANCE=true ise her 5 dakikada bir)
+if (process.env.PLACEMENT_AUTO_REBALANCE === 'true') {
+    cron.schedule('*/5 * * * *', async () => {
+        try {
+            const results = await rebalanceBots();
+            if (results.length > 0) {
+                console.log(`Yeniden dengeleme: ${results.filter((result) => result.success).length}/${results.length} bot taşındı`);
+            }
+        } catch (error) {
+            console.error('Otomatik yeniden dengeleme hatası:', error);
+        }
+    });
+}
+
 // Hata yakalama middleware
 app.use((error, req, res, next) => {
     console.error('Sunucu hatası:', error);